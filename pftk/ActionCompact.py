@@ -0,0 +1,36 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .BaseAction import BaseAction
+from .Font import Font
+from .FontJournal import FontJournal
+
+class ActionCompact(BaseAction):
+	def run(self):
+		journal = FontJournal(self._args.font_filename)
+		if not journal.exists():
+			if self._args.verbose >= 1:
+				print("%s: no journal present, nothing to compact." % (self._args.font_filename))
+			return
+		font = Font.load_from_file(self._args.font_filename)
+		font.save_to_file(self._args.font_filename)
+		if self._args.verbose >= 1:
+			print("%s: journal folded into base file, %s" % (self._args.font_filename, font))
@@ -64,12 +64,22 @@ class ActionConvert(BaseAction):
 				print(glyph)
 				bitmap.print()
 			glyph_data = ", ".join("0x%02x" % (x) for x in bitmap.data)
-			print("UDisplay.create_glyph(font_name, \"%s\", width = %d, height = %d, xoffset = %d, yoffset = %d, xadvance = %d, data = bytes((%s)))," % (codepoint, glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance, glyph_data), file = f)
-
-	def run(self):
-		self._font = Font.load_from_file(self._args.font_filename)
+			if self._args.rotate == 0:
+				print("UDisplay.create_glyph(font_name, \"%s\", width = %d, height = %d, xoffset = %d, yoffset = %d, xadvance = %d, data = bytes((%s)))," % (codepoint, glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance, glyph_data), file = f)
+			else:
+				print("UDisplay.create_glyph(font_name, \"%s\", width = %d, height = %d, xoffset = %d, yoffset = %d, xadvance = %d, yadvance = %d, data = bytes((%s)))," % (codepoint, glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance, glyph.yadvance, glyph_data), file = f)
 
+	def process(self, font):
+		self._font = font
+		if self._args.rotate != 0:
+			if self._args.format == "bitfontmaker":
+				raise Exception("The bitfontmaker format only supports upright glyphs.")
+			self._font = font.rotated(self._args.rotate)
 		method_name = "_convert_" + self._args.format
 		method = getattr(self, method_name)
 		with open(self._args.outfile, "w") as f:
 			method(f)
+		return font
+
+	def run(self):
+		self.process(Font.load_from_file(self._args.font_filename))
@@ -0,0 +1,89 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .BaseAction import BaseAction
+from .Font import Font
+from .GlyphIndex import GlyphIndex
+
+class ActionDiff(BaseAction):
+	@staticmethod
+	def _virtual_pixels(glyph):
+		return { (x + glyph.xoffset, y + glyph.yoffset): glyph.get_pixel(x, y) for y in range(glyph.height) for x in range(glyph.width) }
+
+	def _print_pixel_diff(self, old_glyph, new_glyph):
+		old_pixels = self._virtual_pixels(old_glyph)
+		new_pixels = self._virtual_pixels(new_glyph)
+		coordinates = set(old_pixels) | set(new_pixels)
+		if len(coordinates) == 0:
+			return
+		minx = min(x for (x, y) in coordinates)
+		maxx = max(x for (x, y) in coordinates)
+		miny = min(y for (x, y) in coordinates)
+		maxy = max(y for (x, y) in coordinates)
+		for y in range(miny, maxy + 1):
+			line = ""
+			for x in range(minx, maxx + 1):
+				old_pixel = old_pixels.get((x, y), 255)
+				new_pixel = new_pixels.get((x, y), 255)
+				(old_set, new_set) = (old_pixel < self._args.threshold, new_pixel < self._args.threshold)
+				if old_set and new_set:
+					line += "~" if (old_pixel != new_pixel) else "#"
+				elif new_set:
+					line += "+"
+				elif old_set:
+					line += "-"
+				else:
+					line += "."
+			print("        %s" % (line))
+
+	def _glyph_summary(self, glyph):
+		summary = "%d x %d, offset %d/%d, xadvance %d" % (glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance)
+		if glyph.precise_xadvance != glyph.xadvance:
+			summary += " (%g)" % (glyph.precise_xadvance)
+		return summary
+
+	def run(self):
+		old_font = Font.load_from_file(self._args.old_font)
+		new_font = Font.load_from_file(self._args.new_font)
+		diff = GlyphIndex(old_font).diff(GlyphIndex(new_font))
+
+		for codepoint in diff.added:
+			print("+ \"%s\": %s" % (codepoint, self._glyph_summary(new_font.get_glyph(codepoint))))
+		for codepoint in diff.removed:
+			print("- \"%s\": %s" % (codepoint, self._glyph_summary(old_font.get_glyph(codepoint))))
+		for codepoint in diff.metrics_changed:
+			print("M \"%s\": %s -> %s" % (codepoint, self._glyph_summary(old_font.get_glyph(codepoint)), self._glyph_summary(new_font.get_glyph(codepoint))))
+		for codepoint in diff.pixels_changed:
+			(old_glyph, new_glyph) = (old_font.get_glyph(codepoint), new_font.get_glyph(codepoint))
+			print("P \"%s\": %s -> %s" % (codepoint, self._glyph_summary(old_glyph), self._glyph_summary(new_glyph)))
+			if not self._args.no_pixels:
+				self._print_pixel_diff(old_glyph, new_glyph)
+		if self._args.verbose >= 1:
+			print("%d added, %d removed, %d metrics changed, %d pixels changed, %d unchanged." % (len(diff.added), len(diff.removed), len(diff.metrics_changed), len(diff.pixels_changed), len(diff.unchanged)))
+
+class ActionDuplicates(BaseAction):
+	def run(self):
+		font = Font.load_from_file(self._args.font_filename)
+		duplicates = GlyphIndex(font).find_duplicates()
+		for codepoints in duplicates:
+			print(" ".join("\"%s\"" % (codepoint) for codepoint in codepoints))
+		if self._args.verbose >= 1:
+			print("%d groups of identical glyph bitmaps found." % (len(duplicates)))
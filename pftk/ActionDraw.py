@@ -1,5 +1,5 @@
 #	pixelfonttoolkit - Pixel font generation and handling tools.
-#	Copyright (C) 2020-2020 Johannes Bauer
+#	Copyright (C) 2020-2021 Johannes Bauer
 #
 #	This file is part of pixelfonttoolkit.
 #
@@ -19,25 +19,120 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import collections
 from .BaseAction import BaseAction
 from .Font import Font
-import PIL.Image, PIL.ImageDraw
+from .FontStack import FontStack
+from .RotatedFont import RotatedFont
+from .SubpixelRenderer import SubpixelRenderer
+from .TextLayout import TextLayout, TextAlignment
+from .Canvas import Canvas, FramebufferFormat
 
 class ActionDraw(BaseAction):
-	def _start_draw(self, x, y):
-		self._img.putpixel((x, y), (255, 0, 0, 100))
+	@staticmethod
+	def parse_size(text):
+		(width, height) = text.lower().split("x")
+		return (int(width), int(height))
 
-	def _put_pixel(self, x, y):
-		self._img.putpixel((x, y), (0, 0, 0, 200))
+	@staticmethod
+	def parse_position(text):
+		(x, y) = text.split(",")
+		return (int(x), int(y))
 
-	def _end_draw(self, x, y):
-		self._img.putpixel((x, y), (0, 255, 0, 100))
+	@staticmethod
+	def parse_color(text):
+		value = int(text.lstrip("#"), 16)
+		return ((value >> 16) & 0xff, (value >> 8) & 0xff, (value >> 0) & 0xff)
 
-	def run(self):
-		self._font = Font.load_from_file(self._args.font_filename)
-		self._extents = self._font.get_text_extents(self._args.text)
+	def _start_draw(self, x, y, index):
+		self._guides.append((x, y, (255, 0, 0, 100), index))
+
+	def _end_draw(self, x, y, index):
+		self._guides.append((x, y, (0, 255, 0, 100), index + 1))
+
+	def _index_columns(self):
+		# Drawn glyphs by the canvas columns their boxes cover
+		self._columns = collections.defaultdict(list)
+		for (index, (glyph, x, y, end_x)) in enumerate(self._drawn):
+			(left, top) = (x + glyph.xoffset, y + glyph.yoffset)
+			for column in range(left, left + glyph.width):
+				self._columns[column].append((index, glyph, left, top))
+
+	def _inked_from(self, x, y, index):
+		# Tells if any glyph starting at the given index sets the pixel; glyphs
+		# are drawn after the markers which precede them and cover those
+		for (glyph_index, glyph, left, top) in self._columns.get(x, [ ]):
+			if (glyph_index >= index) and (0 <= y - top < glyph.height) and (glyph.get_pixel(x - left, y - top) < 255):
+				return True
+		return False
+
+	def _draw_guides(self, img):
+		self._guides = [ ]
+		for (index, (glyph, x, y, end_x)) in enumerate(self._drawn):
+			self._start_draw(x, y, index)
+			self._end_draw(end_x, y, index)
+		self._index_columns()
+		for (x, y, color, index) in self._guides:
+			if self._inked_from(x, y, index):
+				continue
+			(x, y) = RotatedFont.transform_pixel(x, y, self._width, self._height, self._args.rotate)
+			if (0 <= x < img.width) and (0 <= y < img.height):
+				img.putpixel((x, y), color)
 
-		self._img = PIL.Image.new("RGBA", (self._extents.width + 20, self._extents.height + 20))
-		self._draw = PIL.ImageDraw.Draw(self._img)
-		self._font.write(self._args.text, 10, self._img.height - 10 - self._extents.height_below_baseline, callback_put_pixel = self._put_pixel, callback_start_draw = self._start_draw, callback_end_draw = self._end_draw)
-		self._img.save(self._args.outfile)
+	def process(self, font):
+		self._font = font
+		if len(self._args.fallback) > 0:
+			self._font = FontStack([ font ] + [ Font.load_from_file(filename) for filename in self._args.fallback ])
+		text_layout = TextLayout(self._font, line_height = self._args.line_height)
+		self._layout = text_layout.layout(self._args.text, max_width = self._args.max_width, alignment = TextAlignment(self._args.align))
+
+		# Text is laid out upright on a canvas of (width, height) and turned
+		# as a whole when rotated
+		if self._args.canvas is None:
+			(width, height) = (self._layout.width + 20, self._layout.height + 20)
+		else:
+			(width, height) = RotatedFont.rotated_size(*self._args.canvas, self._args.rotate)
+		if self._args.origin is None:
+			(posx, posy) = (10, height - 10 - self._layout.height_below_baseline)
+		else:
+			(posx, posy) = self._args.origin
+
+		canvas = Canvas(*RotatedFont.rotated_size(width, height, self._args.rotate))
+		# Glyphs as drawn, as (glyph, x, y, x after advance) in upright
+		# whole pixel coordinates; guides are placed by the same positions
+		if self._args.subpixel is None:
+			text_layout.render(self._args.text, canvas, posx, posy, max_width = self._args.max_width, alignment = TextAlignment(self._args.align), rotation = self._args.rotate)
+			self._drawn = [ (placed_glyph.glyph, posx + placed_glyph.x, posy + placed_glyph.y, posx + placed_glyph.x + placed_glyph.glyph.xadvance) for placed_glyph in self._layout.glyphs ]
+		else:
+			# Lines are broken by the layout, but aligned and filled by the
+			# precise advances of their glyphs
+			if self._args.rotate != 0:
+				raise Exception("Sub-pixel positioning is not supported for rotated output.")
+			subpixel_renderer = SubpixelRenderer(self._font, phases = self._args.subpixel)
+			self._drawn = [ ]
+			line_widths = [ subpixel_renderer.get_text_width(line.text) for line in self._layout.lines ]
+			box_width = self._args.max_width if (self._args.max_width is not None) else max(line_widths)
+			alignment = TextAlignment(self._args.align)
+			for (line, line_width) in zip(self._layout.lines, line_widths):
+				if alignment == TextAlignment.Center:
+					x = (box_width - line_width) / 2
+				elif alignment == TextAlignment.Right:
+					x = box_width - line_width
+				else:
+					x = 0
+				for placed_glyph in subpixel_renderer.place(line.text, posx + x, posy + line.y):
+					canvas.blit(placed_glyph.glyph, placed_glyph.x, placed_glyph.y)
+					self._drawn.append((placed_glyph.glyph, placed_glyph.x, placed_glyph.y, placed_glyph.end_x))
+		framebuffer_format = FramebufferFormat(self._args.format)
+		if framebuffer_format == FramebufferFormat.PNG:
+			img = canvas.to_image(foreground = self._args.foreground, alpha = None if self._args.gray_alpha else 200)
+			if not self._args.no_guides:
+				(self._width, self._height) = (width, height)
+				self._draw_guides(img)
+			img.save(self._args.outfile)
+		else:
+			canvas.write_to_file(self._args.outfile, framebuffer_format, threshold = self._args.threshold, foreground = self._args.foreground, background = self._args.background)
+		return font
+
+	def run(self):
+		self.process(Font.load_from_file(self._args.font_filename))
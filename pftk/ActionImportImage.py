@@ -1,5 +1,5 @@
 #	pixelfonttoolkit - Pixel font generation and handling tools.
-#	Copyright (C) 2020-2020 Johannes Bauer
+#	Copyright (C) 2020-2021 Johannes Bauer
 #
 #	This file is part of pixelfonttoolkit.
 #
@@ -20,37 +20,61 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import sys
-import json
+import argparse
 import collections
 import PIL.Image
 from .BaseAction import BaseAction
 from .Font import Font
 from .Glyph import Glyph
+from .ImagePlane import ImagePlane
+from .PNGStripReader import PNGStripReader
+from .Quantizer import Quantizer, DitherMethod
 
 class ActionImportImage(BaseAction):
 	_BoundingBox = collections.namedtuple("BoundingBox", [ "x", "y", "width", "height" ])
 
-	def _pixel_set(self, x, y):
-		pixel_no = x + (self._img.width * y)
-		pixel = self._data[pixel_no]
-		return pixel != (255, 255, 255)
+	@staticmethod
+	def parse_threshold(text):
+		if text == "auto":
+			return text
+		return int(text)
 
-	def _pixel_get_gray(self, x, y):
-		pixel_no = x + (self._img.width * y)
-		pixel = self._data[pixel_no]
-		return round((pixel[0] + pixel[1] + pixel[2]) / 3)
+	@staticmethod
+	def parse_levels(text):
+		try:
+			return Quantizer(int(text)).levels
+		except ValueError as e:
+			raise argparse.ArgumentTypeError(str(e))
 
-	def _column_empty(self, x):
-		for y in range(self._img.height):
-			if self._pixel_set(x, y):
-				return False
-		return True
+	def _iter_bands(self):
+		# Horizontal bands span the full width, vertical bands the full height
+		band_size = self._args.band_size or max(self._width, self._height, 1)
+		if self._args.band_direction == "horizontal":
+			if self._strips is not None:
+				for (y, band) in self._strips.iter_strips(band_size):
+					yield band
+			else:
+				for y in range(0, self._height, band_size):
+					yield self._img.crop((0, y, self._width, min(y + band_size, self._height)))
+		else:
+			# PNG scanlines can only be decoded from the top, so each vertical
+			# band reads the whole file in strips of about the band's area
+			strip_height = max((band_size * self._height) // max(self._width, 1), 1)
+			for x in range(0, self._width, band_size):
+				if self._strips is not None:
+					yield self._strips.crop_columns(x, min(x + band_size, self._width), strip_height = strip_height)
+				else:
+					yield self._img.crop((x, 0, min(x + band_size, self._width), self._height))
 
-	def _find_horizontal_glyphs(self):
+	def _iter_planes(self):
+		for band in self._iter_bands():
+			yield ImagePlane.from_image(band, threshold = self._threshold, invert = self._invert, color_key = self._args.color_key)
+
+	@staticmethod
+	def _segment_columns(column_empty_flags):
 		glyphs = [ ]
 		current_glyph = None
-		for x in range(self._img.width):
-			empty = self._column_empty(x)
+		for (x, empty) in enumerate(column_empty_flags):
 			if (not empty) and (current_glyph is None):
 				# Start of new glyph
 				current_glyph = [ x, 1 ]
@@ -61,40 +85,119 @@ class ActionImportImage(BaseAction):
 			elif empty and (current_glyph is not None):
 				# End of current glyph
 				current_glyph = None
+		return glyphs
+
+	def _find_glyphs_in_horizontal_bands(self):
+		# Each band only keeps the runs of columns that contain ink within
+		# that band. Glyphs are the runs of columns with ink in any band; their
+		# rows are put together from the runs of each band, with background
+		# for bands that have no ink in the glyph's columns.
+		column_ink = bytearray(self._width)
+		bands = [ ]
+		for plane in self._iter_planes():
+			band_ink = [ not plane.column_empty(x) for x in range(plane.width) ]
+			for (x, ink) in enumerate(band_ink):
+				if ink:
+					column_ink[x] = 1
+			runs = [ (x, width, plane.get_area(x, 0, width, plane.height)) for (x, width) in self._segment_columns(not ink for ink in band_ink) ]
+			bands.append((plane.height, runs))
+		segments = self._segment_columns(not ink for ink in column_ink)
 
-		for (x_start, width) in glyphs:
-			yield self._BoundingBox(x = x_start, y = 0, width = width, height = self._img.height)
+		segment_index = { }
+		for (index, (x, width)) in enumerate(segments):
+			for column in range(x, x + width):
+				segment_index[column] = index
+		pieces = [ { } for segment in segments ]
+		for (band_index, (band_height, runs)) in enumerate(bands):
+			for run in runs:
+				pieces[segment_index[run[0]]].setdefault(band_index, [ ]).append(run)
+		for ((x, width), glyph_pieces) in zip(segments, pieces):
+			rows = [ ]
+			for (band_index, (band_height, runs)) in enumerate(bands):
+				band_data = bytearray(b"\xff" * (width * band_height))
+				for (run_x, run_width, area) in glyph_pieces.get(band_index, [ ]):
+					for y in range(band_height):
+						offset = (y * width) + (run_x - x)
+						band_data[offset : offset + run_width] = area[y * run_width : (y + 1) * run_width]
+				rows.append(band_data)
+			yield (self._BoundingBox(x = x, y = 0, width = width, height = self._height), bytes(b"".join(rows)))
 
-	def _create_glyph(self, codepoint, boundingbox):
-		raw_data = bytearray()
-		for glyph_y in range(boundingbox.height):
-			y = boundingbox.y + glyph_y
-			for glyph_x in range(boundingbox.width):
-				x = boundingbox.x + glyph_x
-				pixel = self._pixel_get_gray(x, y)
-				raw_data.append(pixel)
-		raw_data = bytes(raw_data)
+	def _find_glyphs_in_vertical_bands(self):
+		# Glyphs which extend across a band boundary are carried over as a list
+		# of per-band pieces and assembled row by row once they end.
+		current_glyph = None
+		band_x = 0
+		for plane in self._iter_planes():
+			for x in range(plane.width):
+				empty = plane.column_empty(x)
+				if (not empty) and (current_glyph is None):
+					current_glyph = [ band_x + x, 0, [ ] ]
+				if (current_glyph is not None) and (empty or (x == plane.width - 1)):
+					start_x = max(current_glyph[0] - band_x, 0)
+					end_x = x if empty else (x + 1)
+					current_glyph[1] += end_x - start_x
+					current_glyph[2].append((end_x - start_x, plane.get_area(start_x, 0, end_x - start_x, plane.height)))
+					if empty:
+						yield self._assemble_pieces(*current_glyph)
+						current_glyph = None
+			band_x += plane.width
+		if current_glyph is not None:
+			yield self._assemble_pieces(*current_glyph)
 
+	def _assemble_pieces(self, x, width, pieces):
+		height = self._height
+		raw_data = b"".join(piece[y * piece_width : (y + 1) * piece_width] for y in range(height) for (piece_width, piece) in pieces)
+		return (self._BoundingBox(x = x, y = 0, width = width, height = height), raw_data)
+
+	def _create_glyph(self, codepoint, boundingbox, raw_data):
 		glyph = Glyph(codepoint = codepoint, width = boundingbox.width, height = boundingbox.height, xoffset = 0, yoffset = -boundingbox.height, xadvance = boundingbox.width + 1, raw_data = raw_data)
 		return glyph
 
-	def run(self):
-		self._img = PIL.Image.open(self._args.png_image)
+	def create_font(self):
+		# In band mode, PNG files are decoded a band at a time; anything else is
+		# decoded as a whole and then cut into bands
+		self._strips = PNGStripReader.open(self._args.png_image) if (self._args.band_size is not None) else None
+		if self._strips is not None:
+			(self._img, image_mode) = (None, self._strips.mode)
+			(self._width, self._height) = (self._strips.width, self._strips.height)
+		else:
+			self._img = PIL.Image.open(self._args.png_image)
+			image_mode = self._img.mode
+			(self._width, self._height) = (self._img.width, self._img.height)
 		if self._args.verbose >= 2:
-			print("%s: %d x %d pixels" % (self._args.png_image, self._img.width, self._img.height))
-		self._data = self._img.getdata()
-		glyph_bbs = list(self._find_horizontal_glyphs())
+			print("%s: %d x %d pixels, mode %s" % (self._args.png_image, self._width, self._height, image_mode))
+		if (self._args.verbose >= 1) and (self._args.band_size is not None) and (self._strips is None):
+			print("%s: not a non-interlaced PNG with up to 8 bits per color channel, decoding the whole image before cutting it into bands" % (self._args.png_image))
+		invert = { "auto": None, "yes": True, "no": False }[self._args.invert]
+		(self._threshold, self._invert) = ImagePlane.estimate_parameters(self._iter_bands, threshold = self._args.threshold, invert = invert, color_key = self._args.color_key)
+		if self._args.verbose >= 1:
+			print("Ink threshold: gray value below %d" % (self._threshold if (self._threshold is not None) else 255))
+
+		if self._args.band_direction == "horizontal":
+			found_glyphs = list(self._find_glyphs_in_horizontal_bands())
+		else:
+			found_glyphs = list(self._find_glyphs_in_vertical_bands())
+		(self._img, self._strips) = (None, None)
 		if self._args.verbose >= 2:
-			print("Found %d glyphs: %s" % (len(glyph_bbs), str(glyph_bbs)))
-		elif self._args.verbose >= 2:
-			print("Found %d glyphs." % (len(glyph_bbs)))
-		if len(glyph_bbs) != len(self._args.glyphs):
-			print("Found %d glyphs in image, but specification for %d glyphs. Mismatch; terminating." % (len(glyph_bbs), len(self._args.glyphs)), file = sys.stderr)
+			print("Found %d glyphs: %s" % (len(found_glyphs), str([ glyph_bb for (glyph_bb, raw_data) in found_glyphs ])))
+		elif self._args.verbose >= 1:
+			print("Found %d glyphs." % (len(found_glyphs)))
+		if len(found_glyphs) != len(self._args.glyphs):
+			print("Found %d glyphs in image, but specification for %d glyphs. Mismatch; terminating." % (len(found_glyphs), len(self._args.glyphs)), file = sys.stderr)
 			sys.exit(1)
 
+		quantizer = Quantizer(self._args.quantize, DitherMethod(self._args.dither)) if (self._args.quantize is not None) else None
 		font = Font()
-		for (codepoint, glyph_bb) in zip(self._args.glyphs, glyph_bbs):
-			glyph = self._create_glyph(codepoint, glyph_bb)
+		for (codepoint, (glyph_bb, raw_data)) in zip(self._args.glyphs, found_glyphs):
+			glyph = self._create_glyph(codepoint, glyph_bb, raw_data)
+			if quantizer is not None:
+				glyph = quantizer.quantize_glyph(glyph)
 			font.add_glyph(glyph)
-		with open(self._args.outfile, "w") as f:
-			json.dump(font.serialize(), f)
+		return font
+
+	def process(self, font):
+		return self.create_font()
+
+	def run(self):
+		font = self.create_font()
+		font.save_to_file(self._args.outfile)
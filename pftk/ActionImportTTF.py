@@ -0,0 +1,64 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+from .BaseAction import BaseAction
+from .TTFRasterizer import TTFRasterizer
+
+class ActionImportTTF(BaseAction):
+	@staticmethod
+	def parse_range(range_text):
+		(first, _, last) = range_text.partition("-")
+		first = int(first, 0)
+		last = int(last, 0) if (last != "") else first
+		return range(first, last + 1)
+
+	def _get_chars(self):
+		chars = set(self._args.glyphs or "")
+		for codepoint_range in self._args.range:
+			chars |= set(chr(codepoint) for codepoint in codepoint_range)
+		if len(chars) == 0:
+			chars = set(chr(codepoint) for codepoint in range(0x20, 0x7f))
+		return chars
+
+	def _rasterize(self, sizes):
+		chars = self._get_chars()
+		rasterizer = TTFRasterizer(self._args.ttf_font, antialiasing = self._args.antialiasing)
+		return rasterizer.rasterize(chars, sizes, processes = self._args.jobs)
+
+	def process(self, font):
+		sizes = set(self._args.size)
+		if len(sizes) != 1:
+			raise Exception("Rasterizing inside a pipeline requires exactly one size, %d given." % (len(sizes)))
+		return self._rasterize(sizes)[sizes.pop()]
+
+	def run(self):
+		sizes = sorted(set(self._args.size))
+		if (len(sizes) > 1) and ("%d" not in self._args.outfile):
+			print("Rasterizing %d sizes requires a '%%d' placeholder for the size in the output filename." % (len(sizes)), file = sys.stderr)
+			sys.exit(1)
+
+		fonts = self._rasterize(sizes)
+		for (size, font) in sorted(fonts.items()):
+			outfile = (self._args.outfile % (size)) if ("%d" in self._args.outfile) else self._args.outfile
+			if self._args.verbose >= 1:
+				print("%s size %d: %s written to %s" % (font.name, size, font, outfile))
+			font.save_to_file(outfile)
@@ -19,12 +19,15 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import enum
 import argparse
 import collections
 from .BaseAction import BaseAction
 from .Font import Font
 from .Glyph import Glyph
+from .Quantizer import Quantizer, DitherMethod
+from .Spacing import InkProfile, AutoKerning
 
 class Manipulator(enum.Enum):
 	Optimize = "optimize"
@@ -35,11 +38,20 @@ class Manipulator(enum.Enum):
 	ShiftX = "shift_x"
 	ShiftY = "shift_y"
 	Monospace = "monospace"
+	Quantize = "quantize"
+	Bold = "bold"
+	Outline = "outline"
+	Shadow = "shadow"
+	Autospace = "autospace"
+	Autokern = "autokern"
 
 class ActionManipulate(BaseAction):
 	_Manipulator = collections.namedtuple("Manipulator", [ "action", "args" ])
+	_FontManipulators = set([ Manipulator.Autokern ])
 	_ArgumentCount = {
 		Manipulator.Optimize:	0,
+		Manipulator.Quantize:	2,
+		Manipulator.Shadow:		2,
 	}
 
 	@classmethod
@@ -62,36 +74,79 @@ class ActionManipulate(BaseAction):
 			(action, args) = (Manipulator.ShiftY, [ -int(args[0]) ])
 		elif action == Manipulator.ShiftDown:
 			(action, args) = (Manipulator.ShiftY, [ int(args[0]) ])
-		elif action in [ Manipulator.ShiftX, Manipulator.ShiftY, Manipulator.Monospace ]:
+		elif action in [ Manipulator.ShiftX, Manipulator.ShiftY, Manipulator.Monospace, Manipulator.Bold, Manipulator.Outline, Manipulator.Autospace, Manipulator.Autokern ]:
 			args = [ int(args[0]) ]
+		elif action == Manipulator.Shadow:
+			args = [ int(args[0]), int(args[1]) ]
+		elif action == Manipulator.Quantize:
+			try:
+				(levels, method) = (int(args[0]), DitherMethod(args[1]))
+			except ValueError:
+				raise argparse.ArgumentTypeError("Invalid quantize arguments: expected number of levels and one of %s" % (", ".join(method.value for method in DitherMethod)))
+			try:
+				args = [ Quantizer(levels, method) ]
+			except ValueError as e:
+				raise argparse.ArgumentTypeError("Invalid quantize arguments: %s" % (str(e)))
 		return cls._Manipulator(action = action, args = args)
 
 	def _manipulate_ShiftX(self, glyph, shift):
-		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset + shift, yoffset = glyph.yoffset, xadvance = glyph.xadvance, raw_data = glyph.raw_data)
+		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset + shift, yoffset = glyph.yoffset, xadvance = glyph.xadvance, raw_data = glyph.raw_data, precise_xadvance = glyph.precise_xadvance)
 
 	def _manipulate_ShiftY(self, glyph, shift):
-		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset + shift, xadvance = glyph.xadvance, raw_data = glyph.raw_data)
+		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset + shift, xadvance = glyph.xadvance, raw_data = glyph.raw_data, precise_xadvance = glyph.precise_xadvance)
 
 	def _manipulate_Monospace(self, glyph, xadvance):
-		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = xadvance, raw_data = glyph.raw_data)
+		# All advances become equal, including the fractional ones
+		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = xadvance, raw_data = glyph.raw_data, precise_xadvance = xadvance)
+
+	def _manipulate_Quantize(self, glyph, quantizer):
+		return quantizer.quantize_glyph(glyph)
+
+	def _manipulate_Bold(self, glyph, strength):
+		return glyph.embolden(strength)
+
+	def _manipulate_Outline(self, glyph, thickness):
+		return glyph.outline(thickness)
+
+	def _manipulate_Shadow(self, glyph, dx, dy):
+		return glyph.shadow(dx, dy)
 
 	def _manipulate_Optimize(self, glyph):
 		return glyph.optimize()
 
-	def _manipulate(self, glyph, manipulator):
+	def _manipulate_Autospace(self, glyph, spacing):
+		return InkProfile(glyph).respace(spacing)
+
+	def _manipulate_font_Autokern(self, glyphs, gap):
+		# Kerning is computed between all selected glyphs; stale pairs among
+		# them are removed
+		self._font.replace_kerning([ glyph.codepoint for glyph in glyphs ], AutoKerning(glyphs, gap = gap).compute())
+		return glyphs
+
+	def _manipulate(self, glyphs, manipulator):
+		if manipulator.action in self._FontManipulators:
+			# Operates on all selected glyphs at once
+			method = getattr(self, "_manipulate_font_" + manipulator.action.name)
+			return method(glyphs, *manipulator.args)
 		method_name = "_manipulate_" + manipulator.action.name
 		method = getattr(self, method_name)
-		return method(glyph, *manipulator.args)
+		return [ method(glyph, *manipulator.args) for glyph in glyphs ]
 
-	def run(self):
-		self._font = Font.load_from_file(self._args.infile)
+	def process(self, font):
+		self._font = font
 		if self._args.glyphs is None:
 			glyphs = self._font.get_all_glyphs()
 		else:
 			glyphs = [ self._font.get_glyph(codepoint) for codepoint in set(self._args.glyphs) ]
 		glyphs = [ glyph for glyph in glyphs if glyph is not None ]
 		for manipulator in self._args.manipulator:
-			glyphs = [ self._manipulate(glyph, manipulator) for glyph in glyphs ]
+			glyphs = self._manipulate(glyphs, manipulator)
 		for glyph in glyphs:
 			self._font.replace_glyph(glyph)
-		self._font.save_to_file(self._args.outfile)
+		return self._font
+
+	def run(self):
+		if self._args.journal and (os.path.abspath(self._args.infile) != os.path.abspath(self._args.outfile)):
+			raise Exception("Journaling changes requires the input and output font file to be identical.")
+		font = self.process(Font.load_from_file(self._args.infile))
+		font.save_to_file(self._args.outfile, use_journal = self._args.journal)
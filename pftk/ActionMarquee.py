@@ -0,0 +1,65 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+from .BaseAction import BaseAction
+from .Font import Font
+from .FontStack import FontStack
+from .Marquee import Marquee
+from .Canvas import FramebufferFormat
+
+class ActionMarquee(BaseAction):
+	_ANIMATED_FORMATS = [ "gif", "apng" ]
+
+	def _write_animation(self, frames):
+		images = (frame.to_grayscale_image() for frame in frames)
+		first_image = next(images, None)
+		if first_image is None:
+			print("Text does not produce any frames.", file = sys.stderr)
+			sys.exit(1)
+		pil_format = "GIF" if (self._args.format == "gif") else "PNG"
+		first_image.save(self._args.outfile, format = pil_format, save_all = True, append_images = images, duration = self._args.duration, loop = 0)
+
+	def _write_raw(self, frames):
+		framebuffer_format = FramebufferFormat(self._args.format)
+		with open(self._args.outfile, "wb") as f:
+			for frame in frames:
+				f.write(frame.encode(framebuffer_format, threshold = self._args.threshold))
+
+	def process(self, font):
+		self._font = font
+		if len(self._args.fallback) > 0:
+			self._font = FontStack([ font ] + [ Font.load_from_file(filename) for filename in self._args.fallback ])
+		if self._args.text_file is not None:
+			with open(self._args.text_file) as f:
+				text = f.read().rstrip("\r\n")
+		else:
+			text = self._args.text
+		(width, height) = self._args.canvas
+		marquee = Marquee(self._font, text, width, height, baseline = self._args.baseline, step = self._args.step, lead_in = not self._args.no_lead_in, lead_out = not self._args.no_lead_out)
+		if self._args.format in self._ANIMATED_FORMATS:
+			self._write_animation(iter(marquee))
+		else:
+			self._write_raw(iter(marquee))
+		return font
+
+	def run(self):
+		self.process(Font.load_from_file(self._args.font_filename))
@@ -0,0 +1,40 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+from .BaseAction import BaseAction
+from .Font import Font
+from .Pipeline import Pipeline
+
+class ActionPipeline(BaseAction):
+	def run(self):
+		pipeline = Pipeline(self._args.multicommand)
+		if self._args.pipeline_file is not None:
+			pipeline.add_stages_from_file(self._args.pipeline_file)
+		for stage in self._args.stage:
+			pipeline.add_stage(stage)
+
+		font = Font.load_from_file(self._args.infile) if (self._args.infile is not None) else None
+		if self._args.checkpoint_dir is not None:
+			os.makedirs(self._args.checkpoint_dir, exist_ok = True)
+		font = pipeline.run(font, checkpoint_dir = self._args.checkpoint_dir, verbose = self._args.verbose)
+		if self._args.outfile is not None:
+			font.save_to_file(self._args.outfile)
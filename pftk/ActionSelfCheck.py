@@ -0,0 +1,44 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+from .BaseAction import BaseAction
+from .SelfCheck import SelfCheck
+
+class ActionSelfCheck(BaseAction):
+	def run(self):
+		check = SelfCheck(seed = self._args.seed, verbose = self._args.verbose)
+		print("Checking %d random fonts, seed %d" % (self._args.iterations, check.seed))
+		success = check.run(self._args.iterations)
+
+		print("%-20s %8s %12s %12s %8s" % ("Check", "Calls", "Fast/s", "Reference/s", "Speedup"))
+		for entry in check.throughput:
+			fast_rate = entry.calls / entry.fast_time if (entry.fast_time > 0) else float("inf")
+			reference_rate = entry.calls / entry.reference_time if (entry.reference_time > 0) else float("inf")
+			speedup = entry.reference_time / entry.fast_time if (entry.fast_time > 0) else float("inf")
+			print("%-20s %8d %12.0f %12.0f %7.1fx" % (entry.check, entry.calls, fast_rate, reference_rate, speedup))
+
+		if not success:
+			print("%d mismatches between optimized and reference implementation (seed %d):" % (len(check.mismatches), check.seed), file = sys.stderr)
+			for mismatch in check.mismatches:
+				print("    %s, font %d: %s" % (mismatch.check, mismatch.font_index, mismatch.detail), file = sys.stderr)
+			sys.exit(1)
+		print("All checks passed.")
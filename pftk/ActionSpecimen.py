@@ -0,0 +1,52 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .BaseAction import BaseAction
+from .Font import Font
+from .Specimen import Specimen
+
+class ActionSpecimen(BaseAction):
+	def _get_codepoints(self, font):
+		if (self._args.glyphs is None) and (len(self._args.range) == 0):
+			return None
+		selected = set(self._args.glyphs or "")
+		for codepoint_range in self._args.range:
+			selected |= set(chr(codepoint) for codepoint in codepoint_range)
+		codepoints = [ codepoint for codepoint in font.codepoints if codepoint in selected ]
+		if len(codepoints) == 0:
+			raise Exception("None of the selected glyphs are present in the font.")
+		return codepoints
+
+	def process(self, font):
+		specimen = Specimen(font, codepoints = self._get_codepoints(font), columns = self._args.columns, rows = self._args.rows, scale = self._args.scale, guides = not self._args.no_guides)
+		page_count = specimen.page_count
+		if (page_count > 1) and ("%d" not in self._args.outfile):
+			raise Exception("Writing %d specimen pages requires a '%%d' placeholder for the page number in the output filename." % (page_count))
+		for (page_number, png_data) in specimen.render_pages(processes = self._args.jobs):
+			outfile = (self._args.outfile % (page_number)) if ("%d" in self._args.outfile) else self._args.outfile
+			with open(outfile, "wb") as f:
+				f.write(png_data)
+			if self._args.verbose >= 1:
+				print("Page %d of %d written to %s" % (page_number, page_count, outfile))
+		return font
+
+	def run(self):
+		self.process(Font.load_from_file(self._args.font_filename))
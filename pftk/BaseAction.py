@@ -20,7 +20,13 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 class BaseAction():
-	def __init__(self, cmdname, args):
+	def __init__(self, cmdname, args, run = True):
 		self._cmdname = cmdname
 		self._args = args
-		self.run()
+		if run:
+			self.run()
+
+	def process(self, font):
+		# Pipeline stage: takes the current font (or None) and returns the
+		# font for the next stage
+		raise NotImplementedError("Command '%s' cannot be used as a pipeline stage." % (self._cmdname))
@@ -0,0 +1,204 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import enum
+import PIL.Image
+
+class FramebufferFormat(enum.Enum):
+	PNG = "png"
+	Mono = "mono"
+	MonoPaged = "ssd1306"
+	RGB565LE = "rgb565le"
+	RGB565BE = "rgb565be"
+	RGB888 = "rgb888"
+
+class Canvas(object):
+	def __init__(self, width, height, background = 255):
+		assert(width >= 0)
+		assert(height >= 0)
+		self._width = width
+		self._height = height
+		self._data = bytearray([ background ]) * (width * height)
+
+	@classmethod
+	def from_rows(cls, width, rows):
+		canvas = cls(0, 0)
+		canvas._width = width
+		canvas._height = len(rows)
+		canvas._data = bytearray().join(rows)
+		assert(len(canvas._data) == canvas._width * canvas._height)
+		return canvas
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def data(self):
+		return bytes(self._data)
+
+	def get_row(self, y):
+		offset = y * self.width
+		return self._data[offset : offset + self.width]
+
+	def get_pixel(self, x, y):
+		assert(0 <= x < self.width)
+		assert(0 <= y < self.height)
+		return self._data[(y * self.width) + x]
+
+	def fill(self, x, y, width, height, value = 255):
+		(x0, x1) = (max(x, 0), min(x + width, self.width))
+		if x1 <= x0:
+			return
+		fill_row = bytes([ value ]) * (x1 - x0)
+		for row_y in range(max(y, 0), min(y + height, self.height)):
+			offset = (row_y * self.width) + x0
+			self._data[offset : offset + len(fill_row)] = fill_row
+
+	def blit(self, glyph, posx, posy, clip = None):
+		# Glyph origin is placed at (posx, posy); overlapping pixels keep the
+		# darker value. Only pixels inside the clip rectangle (x, y, width,
+		# height) are drawn, if one is given.
+		(clip_x, clip_y, clip_width, clip_height) = clip if (clip is not None) else (0, 0, self.width, self.height)
+		(clip_x0, clip_y0) = (max(clip_x, 0), max(clip_y, 0))
+		(clip_x1, clip_y1) = (min(clip_x + clip_width, self.width), min(clip_y + clip_height, self.height))
+		x0 = posx + glyph.xoffset
+		y0 = posy + glyph.yoffset
+		gx_start = max(0, clip_x0 - x0)
+		gx_end = min(glyph.width, clip_x1 - x0)
+		if gx_end <= gx_start:
+			return
+		span = gx_end - gx_start
+		raw_data = glyph.raw_data
+		for gy in range(max(0, clip_y0 - y0), min(glyph.height, clip_y1 - y0)):
+			src_offset = (gy * glyph.width) + gx_start
+			dst_offset = ((y0 + gy) * self.width) + x0 + gx_start
+			src = raw_data[src_offset : src_offset + span]
+			dst = self._data[dst_offset : dst_offset + span]
+			self._data[dst_offset : dst_offset + span] = bytes(map(min, src, dst))
+
+	def scroll_left(self, shift, background = 255):
+		shift = min(shift, self.width)
+		if shift <= 0:
+			return
+		padding = bytes([ background ]) * shift
+		self._data = bytearray().join(self._data[(y * self.width) + shift : (y + 1) * self.width] + padding for y in range(self.height))
+
+	def crop(self, x, y, width, height):
+		canvas = Canvas(width, height)
+		for row_y in range(height):
+			src_y = y + row_y
+			if 0 <= src_y < self.height:
+				(x0, x1) = (max(x, 0), min(x + width, self.width))
+				if x1 > x0:
+					src_offset = (src_y * self.width) + x0
+					dst_offset = (row_y * width) + (x0 - x)
+					canvas._data[dst_offset : dst_offset + (x1 - x0)] = self._data[src_offset : src_offset + (x1 - x0)]
+		return canvas
+
+	@staticmethod
+	def _bit_table(threshold):
+		return bytes(0x31 if (value < threshold) else 0x30 for value in range(256))
+
+	@staticmethod
+	def _channel_table(foreground, background):
+		return bytes(round(background + (foreground - background) * (255 - value) / 255) for value in range(256))
+
+	def _interleave(self, tables):
+		result = bytearray(len(self._data) * len(tables))
+		for (channel, table) in enumerate(tables):
+			result[channel :: len(tables)] = self._data.translate(table)
+		return bytes(result)
+
+	def to_mono(self, threshold = 255):
+		# Row-major, MSB is the leftmost pixel, rows padded to full bytes
+		bit_table = self._bit_table(threshold)
+		stride = (self.width + 7) // 8
+		padding = b"0" * ((stride * 8) - self.width)
+		result = bytearray()
+		for y in range(self.height):
+			if stride > 0:
+				result += int(self.get_row(y).translate(bit_table) + padding, 2).to_bytes(stride, "big")
+		return bytes(result)
+
+	def to_mono_paged(self, threshold = 255):
+		# One byte per column for each page of eight rows, LSB is topmost
+		bit_table = self._bit_table(threshold)
+		result = bytearray()
+		if self.width == 0:
+			return bytes(result)
+		for page_y in range(0, self.height, 8):
+			page = bytearray(b"0" * (self.width * 8))
+			for bit in range(min(8, self.height - page_y)):
+				page[7 - bit :: 8] = self.get_row(page_y + bit).translate(bit_table)
+			result += int(page, 2).to_bytes(self.width, "big")
+		return bytes(result)
+
+	def to_rgb565(self, foreground = (0, 0, 0), background = (255, 255, 255), byteorder = "little"):
+		(red, green, blue) = (self._channel_table(fg, bg) for (fg, bg) in zip(foreground, background))
+		values = [ ((red[value] >> 3) << 11) | ((green[value] >> 2) << 5) | (blue[value] >> 3) for value in range(256) ]
+		low_byte = bytes(value & 0xff for value in values)
+		high_byte = bytes(value >> 8 for value in values)
+		if byteorder == "little":
+			return self._interleave((low_byte, high_byte))
+		else:
+			return self._interleave((high_byte, low_byte))
+
+	def to_rgb888(self, foreground = (0, 0, 0), background = (255, 255, 255)):
+		return self._interleave([ self._channel_table(fg, bg) for (fg, bg) in zip(foreground, background) ])
+
+	def to_image(self, foreground = (0, 0, 0), alpha = None):
+		# Without a fixed alpha, the opacity of a pixel follows its gray
+		# value; with one, all set pixels are drawn with that opacity
+		tables = [ bytes([ channel ]) * 256 for channel in foreground ]
+		if alpha is None:
+			tables.append(bytes(range(255, -1, -1)))
+		else:
+			tables.append(bytes([ alpha ]) * 255 + bytes([ 0 ]))
+		return PIL.Image.frombytes("RGBA", (self.width, self.height), self._interleave(tables))
+
+	def to_grayscale_image(self):
+		return PIL.Image.frombytes("L", (self.width, self.height), bytes(self._data))
+
+	def encode(self, framebuffer_format, threshold = 255, foreground = (0, 0, 0), background = (255, 255, 255)):
+		if framebuffer_format == FramebufferFormat.Mono:
+			return self.to_mono(threshold = threshold)
+		elif framebuffer_format == FramebufferFormat.MonoPaged:
+			return self.to_mono_paged(threshold = threshold)
+		elif framebuffer_format == FramebufferFormat.RGB565LE:
+			return self.to_rgb565(foreground = foreground, background = background, byteorder = "little")
+		elif framebuffer_format == FramebufferFormat.RGB565BE:
+			return self.to_rgb565(foreground = foreground, background = background, byteorder = "big")
+		elif framebuffer_format == FramebufferFormat.RGB888:
+			return self.to_rgb888(foreground = foreground, background = background)
+		else:
+			raise NotImplementedError(framebuffer_format)
+
+	def write_to_file(self, filename, framebuffer_format, threshold = 255, foreground = (0, 0, 0), background = (255, 255, 255)):
+		if framebuffer_format == FramebufferFormat.PNG:
+			self.to_image(foreground = foreground).save(filename)
+		else:
+			with open(filename, "wb") as f:
+				f.write(self.encode(framebuffer_format, threshold = threshold, foreground = foreground, background = background))
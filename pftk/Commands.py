@@ -0,0 +1,177 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .MultiCommand import MultiCommand
+from .ActionImportImage import ActionImportImage
+from .ActionImportTTF import ActionImportTTF
+from .ActionConvert import ActionConvert
+from .ActionDraw import ActionDraw
+from .ActionMarquee import ActionMarquee
+from .Canvas import FramebufferFormat
+from .TextLayout import TextAlignment
+from .Quantizer import DitherMethod
+from .ActionManipulate import ActionManipulate
+from .ActionDebug import ActionDebug
+from .ActionDiff import ActionDiff, ActionDuplicates
+from .ActionPipeline import ActionPipeline
+from .ActionCompact import ActionCompact
+from .ActionSelfCheck import ActionSelfCheck
+from .ActionSpecimen import ActionSpecimen
+
+def create_multicommand():
+	# Command table of the command line interface; also used to parse the
+	# stages of a pipeline
+	mc = MultiCommand()
+
+	def genparser(parser):
+		parser.add_argument("-g", "--glyphs", metavar = "glyphstr", required = True, help = "Specifies the characters that correspond to the imported glyphs. Mandatory argument.")
+		parser.add_argument("-t", "--threshold", metavar = "value", type = ActionImportImage.parse_threshold, help = "Gray value below which a pixel is considered ink; lighter pixels are cleared to background. Can be 'auto' to estimate it from the image histogram. By default, anything that is not pure white is ink.")
+		parser.add_argument("--invert", choices = [ "auto", "yes", "no" ], default = "auto", help = "Treat the image as light ink on a dark background. By default, this is detected from the dominant background color. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("--color-key", metavar = "rrggbb", type = ActionDraw.parse_color, help = "Color which is always treated as background, e.g., a grid or separator color.")
+		parser.add_argument("-q", "--quantize", metavar = "levels", type = ActionImportImage.parse_levels, help = "Reduce imported glyphs to this number of gray levels, e.g., 2 for monochrome displays.")
+		parser.add_argument("--dither", choices = [ method.value for method in DitherMethod ], default = "none", help = "Dithering to apply when quantizing. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("-b", "--band-size", metavar = "pixels", type = int, help = "Decode and scan the image in bands of this many pixels to bound memory usage for very large sheets. Only non-interlaced PNG files with up to 8 bits per color channel are decoded band by band; other images are decoded as a whole and then scanned in bands. By default, the whole image is processed at once.")
+		parser.add_argument("--band-direction", choices = [ "vertical", "horizontal" ], default = "vertical", help = "Orientation of the bands: vertical bands are column ranges spanning the full image height, horizontal bands are row ranges spanning the full width. Since PNG files can only be decoded from the top, each vertical band reads the whole file again; horizontal bands read it once and are much faster. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("png_image", help = "Image to import")
+	mc.register("import", "Import a pixel image into the PFG native format", genparser, action = ActionImportImage)
+
+	def genparser(parser):
+		parser.add_argument("-g", "--glyphs", metavar = "glyphstr", help = "Specifies the characters that should be rasterized.")
+		parser.add_argument("-r", "--range", metavar = "first-last", type = ActionImportTTF.parse_range, action = "append", default = [ ], help = "Specifies a codepoint range that should be rasterized, e.g., 0x20-0x7e. Can be specified multiple times. If neither this nor --glyphs is given, printable ASCII is rasterized.")
+		parser.add_argument("-s", "--size", metavar = "pixels", type = int, action = "append", required = True, help = "Font size to rasterize at. Can be specified multiple times to produce multiple fonts. Mandatory argument.")
+		parser.add_argument("-a", "--antialiasing", action = "store_true", help = "Rasterize with anti-aliasing, producing gray level glyphs. By default, glyphs are rasterized with two colors only.")
+		parser.add_argument("-j", "--jobs", metavar = "count", type = int, help = "Number of worker processes to use. Defaults to the number of CPUs.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. When multiple sizes are given, must contain '%%d' which is replaced by the size. Mandatory argument.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("ttf_font", help = "TrueType/OpenType font file to rasterize")
+	mc.register("import-ttf", "Rasterize a TrueType font into the PFG native format", genparser, action = ActionImportTTF)
+
+	def genparser(parser):
+		parser.add_argument("--no-optimize", action = "store_true", help = "By default, glyphs are optimized before conversion for some output formats. This option turns this auto-optimization off.")
+		parser.add_argument("-f", "--format", choices = [ "ascii", "bitfontmaker", "python" ], default = "ascii", help = "Specifies the output format to write. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("-r", "--rotate", metavar = "degrees", type = int, choices = [ 0, 90, 180, 270 ], default = 0, help = "Emit glyphs pre-rotated clockwise by this angle, e.g., for displays that are mounted rotated. Offsets and advance are rotated as well; the python format then also emits the vertical advance. Can be one of %(choices)s, defaults to %(default)d.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename to read")
+	mc.register("convert", "Convert a pftk native font into something else", genparser, action = ActionConvert)
+
+	def genparser(parser):
+		parser.add_argument("-t", "--text", metavar = "text", default = "ABCDEFGHIJKLMNOPQRSTUVWXYZ", help = "Text to draw. Defaults to '%(default)s'.")
+		parser.add_argument("-f", "--format", choices = [ fmt.value for fmt in FramebufferFormat ], default = "png", help = "Specifies the output format to write. All formats other than png are raw framebuffer data. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("-c", "--canvas", metavar = "WxH", type = ActionDraw.parse_size, help = "Fixed canvas size in pixels. By default, the canvas is sized to fit the text with a margin.")
+		parser.add_argument("--origin", metavar = "x,y", type = ActionDraw.parse_position, help = "Pen position of the start of the first baseline on the canvas. By default, the text is placed at the lower left of the canvas with a margin.")
+		parser.add_argument("-w", "--max-width", metavar = "pixels", type = int, help = "Wrap lines at spaces so that no line is wider than this. By default, lines are only broken at newlines.")
+		parser.add_argument("-a", "--align", choices = [ alignment.value for alignment in TextAlignment ], default = "left", help = "Horizontal alignment of the lines within the text box. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("--line-height", metavar = "pixels", type = int, help = "Distance between two baselines. By default, the font's tallest ink extent plus one pixel.")
+		parser.add_argument("--threshold", metavar = "value", type = int, default = 255, help = "Gray value below which a pixel is considered set in monochrome formats. Defaults to %(default)d.")
+		parser.add_argument("--foreground", metavar = "rrggbb", type = ActionDraw.parse_color, default = (0, 0, 0), help = "Ink color for color formats. Defaults to 000000.")
+		parser.add_argument("--background", metavar = "rrggbb", type = ActionDraw.parse_color, default = (255, 255, 255), help = "Background color for raw color formats. Defaults to ffffff.")
+		parser.add_argument("--no-guides", action = "store_true", help = "Do not mark start and end of each glyph in PNG output.")
+		parser.add_argument("--gray-alpha", action = "store_true", help = "In PNG output, derive the opacity of each pixel from its gray value, e.g., for anti-aliased fonts. By default, every set pixel is drawn with the same opacity.")
+		parser.add_argument("--subpixel", metavar = "phases", type = int, help = "Position glyphs within each line at fractional pixel positions using their precise advance, e.g., 4 for quarter pixels. Only useful for anti-aliased fonts that carry precise advances. By default, glyphs are placed on whole pixels.")
+		parser.add_argument("-r", "--rotate", metavar = "degrees", type = int, choices = [ 0, 90, 180, 270 ], default = 0, help = "Rotate the output clockwise by this angle, e.g., for displays that are mounted rotated. --canvas gives the size of the rotated output, while --origin refers to the upright text. Can be one of %(choices)s, defaults to %(default)d.")
+		parser.add_argument("--fallback", metavar = "filename", action = "append", default = [ ], help = "Font used for characters missing from the main font. Can be specified multiple times; fonts are tried in the given order.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename to read")
+	mc.register("draw", "Draw some text using a font into a PNG image or raw framebuffer", genparser, action = ActionDraw)
+
+	def genparser(parser):
+		parser.add_argument("-g", "--glyphs", metavar = "glyphstr", help = "Specifies the characters that should be shown.")
+		parser.add_argument("-r", "--range", metavar = "first-last", type = ActionImportTTF.parse_range, action = "append", default = [ ], help = "Specifies a codepoint range that should be shown, e.g., 0x20-0x7e. Can be specified multiple times. If neither this nor --glyphs is given, all glyphs of the font are shown.")
+		parser.add_argument("--columns", metavar = "count", type = int, default = 16, help = "Number of glyphs per row of a page. Defaults to %(default)d.")
+		parser.add_argument("--rows", metavar = "count", type = int, default = 16, help = "Number of rows per page. Defaults to %(default)d.")
+		parser.add_argument("-s", "--scale", metavar = "factor", type = int, default = 2, help = "Draw every font pixel as a square of this many output pixels. Defaults to %(default)d.")
+		parser.add_argument("--no-guides", action = "store_true", help = "Do not mark baseline, origin and advance of each glyph.")
+		parser.add_argument("-j", "--jobs", metavar = "count", type = int, help = "Number of worker processes to use. Defaults to the number of CPUs.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the PNG file which should be written. Needs a '%%d' placeholder for the page number if there is more than one page. Mandatory argument.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename to read")
+	mc.register("specimen", "Render the glyphs of a font into paged PNG specimen sheets", genparser, action = ActionSpecimen)
+
+	def genparser(parser):
+		parser.add_argument("-t", "--text", metavar = "text", default = "ABCDEFGHIJKLMNOPQRSTUVWXYZ", help = "Text to scroll. Defaults to '%(default)s'.")
+		parser.add_argument("--text-file", metavar = "filename", help = "Read the text to scroll from this file instead.")
+		parser.add_argument("--fallback", metavar = "filename", action = "append", default = [ ], help = "Font used for characters missing from the main font. Can be specified multiple times; fonts are tried in the given order.")
+		parser.add_argument("-c", "--canvas", metavar = "WxH", type = ActionDraw.parse_size, required = True, help = "Display size in pixels. Mandatory argument.")
+		parser.add_argument("-b", "--baseline", metavar = "y", type = int, help = "Row of the display the baseline is placed at. By default, chosen so that all glyphs of the font fit at the bottom.")
+		parser.add_argument("-s", "--step", metavar = "pixels", type = int, default = 1, help = "Number of pixels the text moves between frames. Defaults to %(default)d.")
+		parser.add_argument("--no-lead-in", action = "store_true", help = "Start with the text at the left edge of the display instead of scrolling in from the right.")
+		parser.add_argument("--no-lead-out", action = "store_true", help = "Stop when the end of the text reaches the right edge of the display instead of scrolling it out completely.")
+		parser.add_argument("-f", "--format", choices = ActionMarquee._ANIMATED_FORMATS + [ fmt.value for fmt in FramebufferFormat if fmt != FramebufferFormat.PNG ], default = "gif", help = "Output format. Animated formats are written as one image, all others as a stream of raw frames. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("-d", "--duration", metavar = "ms", type = int, default = 50, help = "Frame duration for animated formats in milliseconds. Defaults to %(default)d.")
+		parser.add_argument("--threshold", metavar = "value", type = int, default = 255, help = "Gray value below which a pixel is considered set in monochrome formats. Defaults to %(default)d.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename to read")
+	mc.register("marquee", "Generate frames of text scrolling across a fixed-size display", genparser, action = ActionMarquee)
+
+	def genparser(parser):
+		parser.add_argument("-g", "--glyphs", metavar = "glyphstr", help = "Specifies which glyphs to apply manipulator to. By default applies to all glyphs.")
+		parser.add_argument("-i", "--infile", metavar = "filename", required = True, help = "Specifies the input font file which should be read. Mandatory argument.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output font file which should be written. Mandatory argument.")
+		parser.add_argument("-j", "--journal", action = "store_true", help = "Append the changed glyphs to the font's journal file instead of rewriting the whole font. Requires the input and output file to be identical.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("manipulator", type = ActionManipulate.parse_manipulator, nargs = "+", help = "Manipulator to apply to glyph(s)")
+	mc.register("manipulate", "Manipulate a font", genparser, action = ActionManipulate)
+
+	def genparser(parser):
+		parser.add_argument("-t", "--threshold", metavar = "value", type = int, default = 255, help = "Gray value below which a pixel is considered set in the pixel diff. Defaults to %(default)d.")
+		parser.add_argument("--no-pixels", action = "store_true", help = "Only list changed glyphs, do not render a pixel diff for each one.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("old_font", help = "Original font filename")
+		parser.add_argument("new_font", help = "Changed font filename")
+	mc.register("diff", "Show differences between two pftk native fonts", genparser, action = ActionDiff)
+
+	def genparser(parser):
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename to read")
+	mc.register("dups", "List glyphs of a font which have identical bitmaps", genparser, action = ActionDuplicates)
+
+	def genparser(parser):
+		parser.add_argument("-s", "--stage", metavar = "command", action = "append", default = [ ], help = "Adds a stage to the pipeline, given as a regular command line without the font file arguments, e.g., \"manipulate optimize\". Can be specified multiple times; stages run in order after those of the pipeline file.")
+		parser.add_argument("-p", "--pipeline-file", metavar = "filename", help = "Reads pipeline stages from this file, one command line per line. Empty lines and comments starting with '#' are ignored.")
+		parser.add_argument("-i", "--infile", metavar = "filename", help = "Font file which is fed into the first stage. Not needed when the pipeline starts with an import stage.")
+		parser.add_argument("-o", "--outfile", metavar = "filename", help = "Save the font resulting from the last stage to this file.")
+		parser.add_argument("-c", "--checkpoint-dir", metavar = "dirname", help = "Save the intermediate font after each stage into this directory.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.set_defaults(multicommand = mc)
+	mc.register("pipeline", "Run import, manipulate and convert stages on an in-memory font", genparser, action = ActionPipeline)
+
+	def genparser(parser):
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename whose journal should be compacted")
+	mc.register("compact", "Fold a font's journal of incremental edits back into the font file", genparser, action = ActionCompact)
+
+	def genparser(parser):
+		parser.add_argument("-n", "--iterations", metavar = "count", type = int, default = 50, help = "Number of random fonts to generate and check. Defaults to %(default)d.")
+		parser.add_argument("-s", "--seed", metavar = "value", type = int, help = "Seed for the random font generator, to reproduce a previous run. By default, a random seed is chosen and printed.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+	mc.register("selfcheck", "Compare the optimized glyph, text and conversion code against the reference implementation", genparser, action = ActionSelfCheck)
+
+	def genparser(parser):
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
+		parser.add_argument("font_filename", help = "Font filename to read")
+	mc.register("debug", "Debug pixelfonttoolkit", genparser, action = ActionDebug)
+
+	return mc
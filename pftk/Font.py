@@ -19,33 +19,85 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import json
-import collections
+from . import JSONBackend
 from .Glyph import Glyph
+from .MonoGlyph import MonoGlyph
+from .FontJournal import FontJournal
+from .TextRenderer import TextRenderer
+from .RotatedFont import RotatedFont
 
-class Font(object):
-	_TextExtents = collections.namedtuple("TextExtents", [ "width", "height", "height_above_baseline", "height_below_baseline", "missing_glyphs", "missing_glyph_count" ])
-
+class Font(TextRenderer):
 	def __init__(self, name = None, size = None, antialiasing = None):
 		self._name = name
 		self._size = size
 		self._antialiasing = antialiasing
+		# Values are either glyphs or, for fonts loaded lazily, their still
+		# undecoded serialized form
 		self._glyphs = { }
+		self._undecoded = 0
+		self._mono_on_decode = False
+		# Color count from the file's metadata, valid until a glyph is replaced
+		self._stored_colors = None
+		self._kerning = { }
+		self._rotated = { }
+		# Metadata and kerning records, and the codepoints of replaced glyphs,
+		# since the font was loaded from file; None if not loaded from file
+		self._changes = None
+		self._changed_glyphs = None
 
 	@property
 	def name(self):
 		return self._name
 
+	@name.setter
+	def name(self, value):
+		self._name = value
+		self._record_change({ "metadata": { "name": value } })
+
 	@property
 	def size(self):
 		return self._size
 
+	@size.setter
+	def size(self, value):
+		self._size = value
+		self._record_change({ "metadata": { "size": value } })
+
 	@property
 	def antialiasing(self):
 		return self._antialiasing
 
+	@antialiasing.setter
+	def antialiasing(self, value):
+		self._antialiasing = value
+		self._record_change({ "metadata": { "antialiasing": value } })
+
+	def _record_change(self, record):
+		if self._changes is not None:
+			self._changes.append(record)
+
+	def _decode(self, codepoint):
+		glyph = self._glyphs.get(codepoint)
+		if isinstance(glyph, dict):
+			glyph = Glyph.deserialize(glyph)
+			if self._mono_on_decode and MonoGlyph.is_representable(glyph):
+				glyph = MonoGlyph.from_glyph(glyph)
+			self._glyphs[codepoint] = glyph
+			self._undecoded -= 1
+		return glyph
+
+	def _decode_all(self):
+		if self._undecoded > 0:
+			for codepoint in list(self._glyphs):
+				self._decode(codepoint)
+
 	@property
 	def colors(self):
+		if self._stored_colors is not None:
+			return self._stored_colors
+		self._decode_all()
 		return max(glyph.colors for glyph in self._glyphs.values())
 
 	def export(self, export_cmd):
@@ -54,23 +106,80 @@ class Font(object):
 		glyph.write_to_pnm(export_cmd)
 
 	def replace_glyph(self, glyph):
+		previous = self._glyphs.get(glyph.codepoint)
+		if isinstance(previous, dict):
+			self._undecoded -= 1
 		self._glyphs[glyph.codepoint] = glyph
+		self._rotated = { }
+		self._stored_colors = None
+		if self._changed_glyphs is not None:
+			# Only the current glyph is journaled, and only if it differs
+			if previous is not None:
+				previous = previous if isinstance(previous, dict) else previous.serialize()
+			if previous != glyph.serialize():
+				self._changed_glyphs[glyph.codepoint] = True
 
 	def add_glyph(self, glyph):
 		if glyph.codepoint in self._glyphs:
-			raise Exception("Glyph codepoint %d already present in font." % (glyph.codepoint))
+			raise Exception("Glyph codepoint \"%s\" already present in font." % (glyph.codepoint))
 		self.replace_glyph(glyph)
 
+	def rotated(self, rotation):
+		# Cached per rotation until a glyph is replaced
+		if rotation not in self._rotated:
+			self._rotated[rotation] = RotatedFont(self, rotation)
+		return self._rotated[rotation]
+
+	def use_mono_glyphs(self):
+		# Switch to the packed row representation if every glyph is purely
+		# two-color; otherwise, all glyphs stay byte-per-pixel.
+		self._decode_all()
+		if not all(isinstance(glyph, MonoGlyph) or MonoGlyph.is_representable(glyph) for glyph in self._glyphs.values()):
+			return False
+		for (codepoint, glyph) in self._glyphs.items():
+			if not isinstance(glyph, MonoGlyph):
+				self._glyphs[codepoint] = MonoGlyph.from_glyph(glyph)
+		return True
+
+	def get_kerning(self, left, right):
+		return self._kerning.get((left, right), 0)
+
+	def set_kerning(self, left, right, value):
+		if value == 0:
+			self._kerning.pop((left, right), None)
+		else:
+			self._kerning[(left, right)] = value
+		self._record_change({ "kerning": [ [ left, right, value ] ] })
+
+	def replace_kerning(self, codepoints, kerning_pairs):
+		# Replaces all kerning among the given codepoints at once; pairs of
+		# them which are not given are removed
+		codepoints = set(codepoints)
+		kerning = { (left, right): value for ((left, right), value) in self._kerning.items() if (left not in codepoints) or (right not in codepoints) }
+		kerning.update({ (left, right): value for (left, right, value) in kerning_pairs if value != 0 })
+		if self._changes is not None:
+			changed = [ [ left, right, kerning.get((left, right), 0) ] for (left, right) in sorted(set(self._kerning) | set(kerning)) if self._kerning.get((left, right), 0) != kerning.get((left, right), 0) ]
+			if len(changed) > 0:
+				self._record_change({ "kerning": changed })
+		self._kerning = kerning
+
+	@property
+	def kerning_pairs(self):
+		return [ (left, right, value) for ((left, right), value) in sorted(self._kerning.items()) ]
+
 	def dump(self):
+		self._decode_all()
 		for (codepoint, glyph) in sorted(self._glyphs.items()):
 			print(glyph)
 
 	@property
 	def max_glyph_width(self):
+		self._decode_all()
 		return max(glyph.width for glyph in self._glyphs.values())
 
 	@property
 	def max_glyph_height(self):
+		self._decode_all()
 		return max(glyph.height for glyph in self._glyphs.values())
 
 #	def enumerate_glyphs(self):
@@ -88,82 +197,89 @@ class Font(object):
 #		return ranges
 
 	def serialize(self):
-		return {
+		serialized_data = {
 			"metadata": {
 				"name":			self.name,
 				"size":			self.size,
 				"antialiasing":	self.antialiasing,
 				"colors":		self.colors,
 			},
-			"glyphs": [ glyph.serialize() for glyph in self._glyphs.values() ],
+			"glyphs": [ glyph if isinstance(glyph, dict) else glyph.serialize() for glyph in self._glyphs.values() ],
 		}
+		if len(self._kerning) > 0:
+			serialized_data["kerning"] = [ list(pair) for pair in self.kerning_pairs ]
+		return serialized_data
 
 	@classmethod
-	def deserialize(cls, font_data):
+	def deserialize(cls, font_data, lazy = False):
 		meta = font_data.get("metadata", { })
 		font = cls(name = meta.get("name"), size = meta.get("size"), antialiasing = meta.get("antialiasing"))
+		for (left, right, value) in font_data.get("kerning", [ ]):
+			font.set_kerning(left, right, value)
+		if lazy and (meta.get("colors") is not None):
+			# Glyphs are only decoded when first accessed. The stored color
+			# count tells whether they are candidates for MonoGlyph.
+			font._mono_on_decode = (meta["colors"] == 2)
+			font._stored_colors = meta["colors"]
+			for glyph_data in font_data["glyphs"]:
+				if glyph_data["codepoint"] in font._glyphs:
+					raise Exception("Glyph codepoint \"%s\" already present in font." % (glyph_data["codepoint"]))
+				font._glyphs[glyph_data["codepoint"]] = glyph_data
+			font._undecoded = len(font._glyphs)
+			return font
 		for glyph_data in font_data["glyphs"]:
 			glyph = Glyph.deserialize(glyph_data)
 			font.add_glyph(glyph)
+		if (len(font) > 0) and (font.colors == 2):
+			font.use_mono_glyphs()
 		return font
 
 	@classmethod
-	def load_from_file(cls, filename):
-		with open(filename) as f:
-			font_data = json.load(f)
-		font = cls.deserialize(font_data)
+	def load_from_file(cls, filename, use_journal = True):
+		with open(filename, "rb") as f:
+			font_data = JSONBackend.loads(f.read())
+		font = cls.deserialize(font_data, lazy = True)
+		journal = FontJournal(filename)
+		if use_journal and journal.exists():
+			if (journal.replay(font) > 0) and (font.colors == 2):
+				font.use_mono_glyphs()
+		font._changes = [ ]
+		font._changed_glyphs = { }
 		return font
 
-	def save_to_file(self, filename):
-		with open(filename, "w") as f:
-			json.dump(self.serialize(), f)
-			print(file = f)
-
-	def get_text_extents(self, text):
-		missing_glyphs = set()
-		missing_glyph_count = 0
-		posx = 0
-		max_y_above = 0
-		max_y_below = 0
-		for char in text:
-			glyph = self._glyphs.get(char)
-			if glyph is None:
-				missing_glyph_count += 1
-				missing_glyphs.add(char)
-			else:
-				for (x, y) in glyph.iter_set_pixels(mode = "virtual"):
-					if y <= 0:
-						# Above baseline
-						max_y_above = max(max_y_above, abs(y))
-					else:
-						# Below baseline
-						max_y_below = max(max_y_below, y)
-				posx += glyph.xadvance
-		return self._TextExtents(width = posx, height = max_y_above + max_y_below, height_above_baseline = max_y_above, height_below_baseline = max_y_below, missing_glyphs = missing_glyphs, missing_glyph_count = missing_glyph_count)
-
-	def write(self, text, posx, posy, callback_put_pixel = None, callback_missing_glyph = None, callback_start_draw = None, callback_end_draw = None):
-		for char in text:
-			glyph = self._glyphs.get(char)
-			if glyph is None:
-				if callback_missing_glyph is not None:
-					callback_missing_glyph()
-			else:
-				if callback_start_draw is not None:
-					callback_start_draw(posx, posy)
-				for (x, y) in glyph.iter_set_pixels(mode = "virtual", ref = (posx, posy)):
-					if callback_put_pixel is not None:
-						callback_put_pixel(x, y)
-				posx += glyph.xadvance
-				if callback_end_draw is not None:
-					callback_end_draw(posx, posy)
+	def save_to_file(self, filename, use_journal = False):
+		journal = FontJournal(filename)
+		if use_journal:
+			if self._changes is None:
+				raise Exception("Only changes to a font that was loaded from a file can be journaled.")
+			records = self._changes + [ { "glyph": self._glyphs[codepoint].serialize() } for codepoint in self._changed_glyphs ]
+			if len(records) > 0:
+				journal.append(records)
+		else:
+			tmp_filename = filename + ".tmp"
+			with open(tmp_filename, "w") as f:
+				json.dump(self.serialize(), f)
+				print(file = f)
+			os.replace(tmp_filename, filename)
+			journal.remove()
+		if self._changes is not None:
+			self._changes = [ ]
+			self._changed_glyphs = { }
 
 	def get_glyph(self, codepoint):
-		return self._glyphs.get(codepoint)
+		return self._decode(codepoint)
+
+	@property
+	def codepoints(self):
+		# Sorted without decoding any glyph
+		return sorted(self._glyphs)
 
 	def get_all_glyphs(self):
+		self._decode_all()
 		return self._glyphs.values()
 
 	def __iter__(self):
+		self._decode_all()
 		return iter(sorted(self._glyphs.items()))
 
 	def __len__(self):
@@ -0,0 +1,84 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import json
+from .Glyph import Glyph
+
+class FontJournal(object):
+	# Append-only log of changes made to a font file. The first record
+	# identifies the base file the journal applies to, every following line
+	# is a glyph replacement, a metadata change or a kerning change.
+	def __init__(self, font_filename):
+		self._font_filename = font_filename
+		self._filename = font_filename + ".journal"
+
+	@property
+	def filename(self):
+		return self._filename
+
+	def exists(self):
+		return os.path.exists(self._filename)
+
+	def _base_identity(self):
+		stat = os.stat(self._font_filename)
+		return { "base_size": stat.st_size, "base_mtime_ns": stat.st_mtime_ns }
+
+	def _iter_records(self):
+		with open(self._filename) as f:
+			for line in f:
+				line = line.strip()
+				if line != "":
+					yield json.loads(line)
+
+	def replay(self, font):
+		records = self._iter_records()
+		header = next(records, None)
+		if header != self._base_identity():
+			raise Exception("Journal %s does not belong to the current version of %s; it was probably modified after the journal was started." % (self._filename, self._font_filename))
+		record_count = 0
+		for record in records:
+			if "glyph" in record:
+				font.replace_glyph(Glyph.deserialize(record["glyph"]))
+			elif "metadata" in record:
+				for (key, value) in record["metadata"].items():
+					setattr(font, key, value)
+			elif "kerning" in record:
+				for (left, right, value) in record["kerning"]:
+					font.set_kerning(left, right, value)
+			else:
+				raise Exception("Unknown journal record in %s: %s" % (self._filename, str(record)))
+			record_count += 1
+		return record_count
+
+	def append(self, records):
+		if not os.path.exists(self._font_filename):
+			raise Exception("Cannot journal changes to %s: base font file does not exist." % (self._font_filename))
+		header = None if self.exists() else self._base_identity()
+		with open(self._filename, "a") as f:
+			if header is not None:
+				print(json.dumps(header), file = f)
+			for record in records:
+				print(json.dumps(record), file = f)
+
+	def remove(self):
+		if self.exists():
+			os.unlink(self._filename)
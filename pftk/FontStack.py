@@ -0,0 +1,90 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .Glyph import Glyph
+from .TextRenderer import TextRenderer
+from .RotatedFont import RotatedFont
+
+class FontStack(TextRenderer):
+	# Ordered list of fonts; each codepoint is taken from the first font that
+	# has it. Resolutions (including misses) are cached as they are looked up.
+	def __init__(self, fonts, baseline_shifts = None):
+		self._fonts = list(fonts)
+		if baseline_shifts is None:
+			baseline_shifts = [ 0 ] * len(self._fonts)
+		assert(len(baseline_shifts) == len(self._fonts))
+		self._baseline_shifts = list(baseline_shifts)
+		self._resolved = { }
+		self._rotated = { }
+
+	@property
+	def fonts(self):
+		return iter(self._fonts)
+
+	def _resolve(self, codepoint):
+		for (font_index, (font, baseline_shift)) in enumerate(zip(self._fonts, self._baseline_shifts)):
+			glyph = font.get_glyph(codepoint)
+			if glyph is not None:
+				if baseline_shift != 0:
+					glyph = Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset + baseline_shift, xadvance = glyph.xadvance, raw_data = glyph.raw_data, precise_xadvance = glyph.precise_xadvance)
+				return (glyph, font_index)
+		return (None, None)
+
+	def resolve(self, codepoint):
+		resolution = self._resolved.get(codepoint)
+		if resolution is None:
+			resolution = self._resolve(codepoint)
+			self._resolved[codepoint] = resolution
+		return resolution
+
+	def get_glyph(self, codepoint):
+		return self.resolve(codepoint)[0]
+
+	def get_font_index(self, codepoint):
+		return self.resolve(codepoint)[1]
+
+	def get_kerning(self, left, right):
+		# Kerning only applies between glyphs taken from the same font
+		font_index = self.get_font_index(left)
+		if (font_index is None) or (font_index != self.get_font_index(right)):
+			return 0
+		return self._fonts[font_index].get_kerning(left, right)
+
+	def get_all_glyphs(self):
+		codepoints = set()
+		for font in self._fonts:
+			codepoints |= set(glyph.codepoint for glyph in font.get_all_glyphs())
+		return [ self.get_glyph(codepoint) for codepoint in sorted(codepoints) ]
+
+	def rotated(self, rotation):
+		if rotation not in self._rotated:
+			self._rotated[rotation] = RotatedFont(self, rotation)
+		return self._rotated[rotation]
+
+	def invalidate(self):
+		self._resolved = { }
+		self._rotated = { }
+
+	def __len__(self):
+		return len(self.get_all_glyphs())
+
+	def __str__(self):
+		return "FontStack<%s>" % (", ".join(str(font) for font in self._fonts))
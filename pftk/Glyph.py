@@ -19,10 +19,11 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import hashlib
 import collections
 
 class BitmapGlyph(object):
-	def __init__(self, glyph, mode = "xbit"):
+	def __init__(self, glyph, mode = "xbit", data = None):
 		assert(mode in [ "xbit", "ybit" ])
 		self._glyph = glyph
 		self._mode = mode
@@ -32,7 +33,11 @@ class BitmapGlyph(object):
 		else:
 			self._width = self._glyph.width
 			self._height = (self._glyph.height + 7) // 8
-		self._data = bytearray(self._width * self._height)
+		if data is None:
+			self._data = bytearray(self._width * self._height)
+		else:
+			assert(len(data) == self._width * self._height)
+			self._data = bytearray(data)
 
 	@classmethod
 	def create_from_glyph(cls, glyph, threshold, mode = "xbit"):
@@ -101,9 +106,11 @@ class BitmapGlyph(object):
 
 class Glyph(object):
 	_GlyphExtents = collections.namedtuple("GlyphExtents", [ "minx", "maxx", "miny", "maxy" ])
+	_ROW_PIXELS = bytes(0x00 if (value == ord("1")) else 0xff for value in range(256))
+	_row_bit_tables = { }
 
-	def __init__(self, codepoint, width, height, xoffset, yoffset, xadvance, raw_data):
-		assert(isinstance(raw_data, bytes))
+	def __init__(self, codepoint, width, height, xoffset, yoffset, xadvance, raw_data, precise_xadvance = None):
+		assert(isinstance(raw_data, (bytes, memoryview)))
 		assert(len(raw_data) == width * height)
 		self._codepoint = codepoint
 		self._width = width
@@ -111,7 +118,14 @@ class Glyph(object):
 		self._xoffset = xoffset
 		self._yoffset = yoffset
 		self._xadvance = xadvance
-		self._raw_data = bytes(raw_data)
+		self._precise_xadvance = self._fractional_advance(xadvance, precise_xadvance)
+		# Read-only memoryviews (e.g., into shared memory) are kept uncopied
+		self._raw_data = raw_data if isinstance(raw_data, memoryview) else bytes(raw_data)
+
+	@staticmethod
+	def _fractional_advance(xadvance, precise_xadvance):
+		# Only kept when it differs from the integer advance
+		return precise_xadvance if (precise_xadvance != xadvance) else None
 
 	@property
 	def colors(self):
@@ -141,10 +155,37 @@ class Glyph(object):
 	def xadvance(self):
 		return self._xadvance
 
+	@property
+	def precise_xadvance(self):
+		# Fractional advance for sub-pixel positioning, if the font has one
+		return self._precise_xadvance if (self._precise_xadvance is not None) else self._xadvance
+
+	@property
+	def yadvance(self):
+		# Upright glyphs always advance horizontally
+		return 0
+
 	@property
 	def raw_data(self):
 		return self._raw_data
 
+	@property
+	def metrics(self):
+		return (self.xoffset, self.yoffset, self.xadvance, self.precise_xadvance)
+
+	@property
+	def bitmap_hash(self):
+		bitmap_hash = hashlib.sha256()
+		bitmap_hash.update(b"%d,%d:" % (self.width, self.height))
+		bitmap_hash.update(self.raw_data)
+		return bitmap_hash.digest()
+
+	@property
+	def content_hash(self):
+		content_hash = hashlib.sha256(self.bitmap_hash)
+		content_hash.update(repr(self.metrics).encode())
+		return content_hash.digest()
+
 	def get_pixel(self, x, y):
 		assert(0 <= x < self.width)
 		assert(0 <= y < self.height)
@@ -199,11 +240,112 @@ class Glyph(object):
 				offset = ((y - extents.miny) * new_width) + (x - extents.minx)
 				raw_data[offset] = pixel
 			raw_data = bytes(raw_data)
-			new_glyph = Glyph(codepoint = self.codepoint, width = new_width, height = new_height, xoffset = self.xoffset + extents.minx, yoffset = self.yoffset + extents.miny, xadvance = self.xadvance, raw_data = raw_data)
+			new_glyph = Glyph(codepoint = self.codepoint, width = new_width, height = new_height, xoffset = self.xoffset + extents.minx, yoffset = self.yoffset + extents.miny, xadvance = self.xadvance, raw_data = raw_data, precise_xadvance = self.precise_xadvance)
 		else:
-			raise NotImplementedError("optimizing completely empty glyph")
+			# Blank glyphs, e.g., spaces, only keep their advance
+			new_glyph = Glyph(codepoint = self.codepoint, width = 0, height = 0, xoffset = 0, yoffset = 0, xadvance = self.xadvance, raw_data = bytes(), precise_xadvance = self.precise_xadvance)
 		return new_glyph
 
+	@classmethod
+	def _row_bit_table(cls, threshold):
+		table = cls._row_bit_tables.get(threshold)
+		if table is None:
+			table = bytes(ord("1") if (value < threshold) else ord("0") for value in range(256))
+			cls._row_bit_tables[threshold] = table
+		return table
+
+	def get_rows(self, threshold = 255):
+		# One integer per row, bit x is set if pixel x is set
+		if self.width == 0:
+			return [ 0 ] * self.height
+		table = self._row_bit_table(threshold)
+		return [ int(bytes(self.raw_data[y * self.width : (y + 1) * self.width]).translate(table)[::-1], 2) for y in range(self.height) ]
+
+	@classmethod
+	def from_rows(cls, codepoint, width, rows, xoffset, yoffset, xadvance, precise_xadvance = None):
+		mask = (1 << width) - 1
+		row_format = "0%db" % (width)
+		raw_data = "".join(format(row & mask, row_format)[::-1] for row in rows).encode().translate(cls._ROW_PIXELS) if (width > 0) else bytes()
+		return cls(codepoint = codepoint, width = width, height = len(rows), xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, raw_data = raw_data, precise_xadvance = precise_xadvance)
+
+	@staticmethod
+	def _dilate_rows(rows):
+		horizontal = [ row | (row << 1) | (row >> 1) for row in rows ]
+		return [ horizontal[y] | (horizontal[y - 1] if (y > 0) else 0) | (horizontal[y + 1] if (y + 1 < len(rows)) else 0) for y in range(len(rows)) ]
+
+	@property
+	def two_color(self):
+		return len(bytes(self.raw_data).translate(None, b"\x00\xff")) == 0
+
+	def _gray_rows(self):
+		return [ bytes(self.raw_data[y * self.width : (y + 1) * self.width]) for y in range(self.height) ]
+
+	@staticmethod
+	def _darkest(*rows):
+		# Gray counterpart of OR-ing bit rows: the most inked pixel wins
+		return bytes(map(min, *rows))
+
+	@classmethod
+	def _dilate_gray_rows(cls, rows):
+		horizontal = [ cls._darkest(b"\xff" + row[:-1], row, row[1:] + b"\xff") for row in rows ]
+		return [ cls._darkest(horizontal[y - 1] if (y > 0) else horizontal[y], horizontal[y], horizontal[y + 1] if (y + 1 < len(rows)) else horizontal[y]) for y in range(len(rows)) ]
+
+	def _from_gray_rows(self, width, rows, xoffset, yoffset, xadvance, precise_xadvance):
+		return Glyph(codepoint = self.codepoint, width = width, height = len(rows), xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, raw_data = b"".join(rows), precise_xadvance = precise_xadvance)
+
+	# Two-color glyphs are transformed as bit rows. Other glyphs keep their
+	# gray levels, overlapping pixels take the darker value.
+	def embolden(self, strength = 1):
+		(width, xadvance, precise_xadvance) = (self.width + strength, self.xadvance + strength, self.precise_xadvance + strength)
+		if not self.two_color:
+			rows = self._gray_rows()
+			bold_rows = [ self._darkest(*((b"\xff" * shift) + row + (b"\xff" * (strength - shift)) for shift in range(strength + 1))) for row in rows ]
+			return self._from_gray_rows(width, bold_rows, self.xoffset, self.yoffset, xadvance, precise_xadvance)
+		rows = self.get_rows()
+		bold_rows = list(rows)
+		for shift in range(1, strength + 1):
+			bold_rows = [ bold_row | (row << shift) for (bold_row, row) in zip(bold_rows, rows) ]
+		return self.from_rows(codepoint = self.codepoint, width = width, rows = bold_rows, xoffset = self.xoffset, yoffset = self.yoffset, xadvance = xadvance, precise_xadvance = precise_xadvance)
+
+	def outline(self, thickness = 1):
+		(width, xoffset, yoffset) = (self.width + (2 * thickness), self.xoffset - thickness, self.yoffset - thickness)
+		(xadvance, precise_xadvance) = (self.xadvance + (2 * thickness), self.precise_xadvance + (2 * thickness))
+		if not self.two_color:
+			padding = [ b"\xff" * width ] * thickness
+			rows = padding + [ (b"\xff" * thickness) + row + (b"\xff" * thickness) for row in self._gray_rows() ] + padding
+			dilated_rows = rows
+			for i in range(thickness):
+				dilated_rows = self._dilate_gray_rows(dilated_rows)
+			# Keeps the ink the dilation added on top of the original
+			outline_rows = [ bytes(255 - max(pixel - dilated_pixel, 0) for (dilated_pixel, pixel) in zip(dilated_row, row)) for (dilated_row, row) in zip(dilated_rows, rows) ]
+			return self._from_gray_rows(width, outline_rows, xoffset, yoffset, xadvance, precise_xadvance)
+		padding = [ 0 ] * thickness
+		rows = padding + [ row << thickness for row in self.get_rows() ] + padding
+		dilated_rows = rows
+		for i in range(thickness):
+			dilated_rows = self._dilate_rows(dilated_rows)
+		outline_rows = [ dilated_row & ~row for (dilated_row, row) in zip(dilated_rows, rows) ]
+		return self.from_rows(codepoint = self.codepoint, width = width, rows = outline_rows, xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, precise_xadvance = precise_xadvance)
+
+	def shadow(self, dx = 1, dy = 1):
+		(glyph_x, glyph_y) = (max(-dx, 0), max(-dy, 0))
+		(shadow_x, shadow_y) = (glyph_x + dx, glyph_y + dy)
+		(width, height) = (self.width + abs(dx), self.height + abs(dy))
+		# A shadow to the left does not widen the advance
+		(xadvance, precise_xadvance) = (self.xadvance + max(dx, 0), self.precise_xadvance + max(dx, 0))
+		if not self.two_color:
+			shadow_rows = [ b"\xff" * width ] * height
+			for (y, row) in enumerate(self._gray_rows()):
+				for (x0, y0) in [ (glyph_x, glyph_y + y), (shadow_x, shadow_y + y) ]:
+					shadow_rows[y0] = self._darkest(shadow_rows[y0], (b"\xff" * x0) + row + (b"\xff" * (width - self.width - x0)))
+			return self._from_gray_rows(width, shadow_rows, self.xoffset - glyph_x, self.yoffset - glyph_y, xadvance, precise_xadvance)
+		rows = self.get_rows()
+		shadow_rows = [ 0 ] * height
+		for (y, row) in enumerate(rows):
+			shadow_rows[y + glyph_y] |= row << glyph_x
+			shadow_rows[y + shadow_y] |= row << shadow_x
+		return self.from_rows(codepoint = self.codepoint, width = width, rows = shadow_rows, xoffset = self.xoffset - glyph_x, yoffset = self.yoffset - glyph_y, xadvance = xadvance, precise_xadvance = precise_xadvance)
+
 	def get_bitmap(self, threshold = 255, mode = "xbit"):
 		bitmap = BitmapGlyph.create_from_glyph(glyph = self, threshold = threshold, mode = mode)
 		return bitmap
@@ -228,19 +370,22 @@ class Glyph(object):
 			print(charspace.join(line), file = f)
 
 	def serialize(self):
-		return {
+		serialized_data = {
 			"codepoint":	self.codepoint,
 			"width":		self.width,
 			"height":		self.height,
 			"xoffset":		self.xoffset,
 			"yoffset":		self.yoffset,
 			"xadvance":		self.xadvance,
-			"data":			self._raw_data.hex(),
+			"data":			self.raw_data.hex(),
 		}
+		if self._precise_xadvance is not None:
+			serialized_data["precise_xadvance"] = self._precise_xadvance
+		return serialized_data
 
 	@classmethod
 	def deserialize(cls, glyph_data):
-		return cls(codepoint = glyph_data["codepoint"], width = glyph_data["width"], height = glyph_data["height"], xoffset = glyph_data["xoffset"], yoffset = glyph_data["yoffset"], xadvance = glyph_data.get("xadvance", 0), raw_data = bytes.fromhex(glyph_data["data"]))
+		return cls(codepoint = glyph_data["codepoint"], width = glyph_data["width"], height = glyph_data["height"], xoffset = glyph_data["xoffset"], yoffset = glyph_data["yoffset"], xadvance = glyph_data.get("xadvance", 0), raw_data = bytes.fromhex(glyph_data["data"]), precise_xadvance = glyph_data.get("precise_xadvance"))
 
 	def __str__(self):
 		return "Glyph<\"%s\", %d x %d, %d bytes>" % (self.codepoint, self.width, self.height, len(self.raw_data))
@@ -0,0 +1,56 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import collections
+
+class GlyphIndex(object):
+	_DiffResult = collections.namedtuple("DiffResult", [ "added", "removed", "metrics_changed", "pixels_changed", "unchanged" ])
+
+	def __init__(self, font):
+		self._font = font
+		self._content_hashes = { }
+		self._bitmap_hashes = { }
+		self._by_bitmap_hash = collections.defaultdict(list)
+		for glyph in font.get_all_glyphs():
+			bitmap_hash = glyph.bitmap_hash
+			self._bitmap_hashes[glyph.codepoint] = bitmap_hash
+			self._content_hashes[glyph.codepoint] = glyph.content_hash
+			self._by_bitmap_hash[bitmap_hash].append(glyph.codepoint)
+
+	@property
+	def font(self):
+		return self._font
+
+	def find_duplicates(self):
+		return sorted(sorted(codepoints) for codepoints in self._by_bitmap_hash.values() if len(codepoints) > 1)
+
+	def diff(self, new_index):
+		old_codepoints = set(self._content_hashes)
+		new_codepoints = set(new_index._content_hashes)
+		(metrics_changed, pixels_changed, unchanged) = ([ ], [ ], [ ])
+		for codepoint in sorted(old_codepoints & new_codepoints):
+			if self._content_hashes[codepoint] == new_index._content_hashes[codepoint]:
+				unchanged.append(codepoint)
+			elif self._bitmap_hashes[codepoint] == new_index._bitmap_hashes[codepoint]:
+				metrics_changed.append(codepoint)
+			else:
+				pixels_changed.append(codepoint)
+		return self._DiffResult(added = sorted(new_codepoints - old_codepoints), removed = sorted(old_codepoints - new_codepoints), metrics_changed = metrics_changed, pixels_changed = pixels_changed, unchanged = unchanged)
@@ -0,0 +1,171 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import PIL.Image, PIL.ImageChops, PIL.ImageOps
+
+class ImagePlane(object):
+	# 8-bit gray plane in the same convention as glyph data: 0 is full ink,
+	# 255 is background. Pixels at or above the threshold are background.
+	def __init__(self, width, height, data, threshold = 255):
+		assert(len(data) == width * height)
+		self._width = width
+		self._height = height
+		self._data = bytes(data)
+		self._threshold = threshold
+
+	@classmethod
+	def from_image(cls, img, threshold = None, invert = None, color_key = None):
+		# threshold is an integer, "auto" for an Otsu estimate or None to treat
+		# anything but pure white as ink; invert=None detects light-on-dark
+		# sheets from the dominant background value
+		key_mask = cls._color_key_mask(img, color_key) if (color_key is not None) else None
+		gray = cls._decode_gray(img, invert_alpha = (invert is True))
+
+		if invert is None:
+			invert = cls.estimate_background(gray.histogram()) < 128
+		if invert:
+			gray = PIL.ImageOps.invert(gray)
+		if key_mask is not None:
+			gray.paste(255, mask = key_mask)
+
+		if threshold is None:
+			threshold = 255
+		elif threshold == "auto":
+			threshold = cls.otsu_threshold(gray.histogram())
+		if threshold < 255:
+			gray = gray.point([ value if (value < threshold) else 255 for value in range(256) ])
+		return cls(gray.width, gray.height, gray.tobytes(), threshold = threshold)
+
+	@classmethod
+	def estimate_parameters(cls, iter_bands, threshold = None, invert = None, color_key = None):
+		# Determines inversion and "auto" threshold for a sheet that is decoded
+		# in bands; iter_bands() is called for each required pass and must
+		# yield the bands as PIL images
+		if invert is None:
+			histogram = [ 0 ] * 256
+			for band in iter_bands():
+				histogram = [ a + b for (a, b) in zip(histogram, cls._decode_gray(band).histogram()) ]
+			invert = cls.estimate_background(histogram) < 128
+		if threshold == "auto":
+			histogram = [ 0 ] * 256
+			for band in iter_bands():
+				plane = cls.from_image(band, threshold = None, invert = invert, color_key = color_key)
+				histogram = [ a + b for (a, b) in zip(histogram, plane.histogram()) ]
+			threshold = cls.otsu_threshold(histogram)
+		return (threshold, invert)
+
+	@classmethod
+	def _decode_gray(cls, img, invert_alpha = False):
+		if img.mode in [ "I", "I;16", "I;16L", "I;16B", "I;16N" ]:
+			img = img.convert("I").point(lambda value: value * (1 / 256))
+			return img.convert("L")
+		if img.mode == "F":
+			return img.convert("L")
+		has_alpha = ("A" in img.getbands()) or ("transparency" in img.info)
+		if not has_alpha:
+			return cls._average_gray(img)
+		img = img.convert("RGBA")
+		background_color = (0, 0, 0, 255) if invert_alpha else (255, 255, 255, 255)
+		background = PIL.Image.new("RGBA", img.size, background_color)
+		return cls._average_gray(PIL.Image.alpha_composite(background, img))
+
+	@staticmethod
+	def _average_gray(img):
+		# Unweighted mean of the color channels like the original importer,
+		# not the luma weighting of a plain convert("L")
+		if img.mode in [ "1", "L" ]:
+			return img.convert("L")
+		return img.convert("RGB").convert("L", matrix = (1 / 3, 1 / 3, 1 / 3, 0))
+
+	@classmethod
+	def _color_key_mask(cls, img, color_key):
+		bands = img.convert("RGB").split()
+		mask = None
+		for (band, key_value) in zip(bands, color_key):
+			band_mask = band.point([ 255 if (value == key_value) else 0 for value in range(256) ])
+			mask = band_mask if (mask is None) else PIL.ImageChops.multiply(mask, band_mask)
+		return mask
+
+	@staticmethod
+	def estimate_background(histogram):
+		histogram = histogram[:256]
+		return max(range(256), key = lambda value: histogram[value])
+
+	@staticmethod
+	def otsu_threshold(histogram):
+		# Returns the threshold so that values below it are classified as ink
+		histogram = histogram[:256]
+		total = sum(histogram)
+		if total == 0:
+			return 255
+		total_sum = sum(value * count for (value, count) in enumerate(histogram))
+		(weight_ink, sum_ink) = (0, 0)
+		(best_variance, best_threshold) = (-1, 255)
+		for value in range(256):
+			weight_ink += histogram[value]
+			if weight_ink == 0:
+				continue
+			weight_background = total - weight_ink
+			if weight_background == 0:
+				break
+			sum_ink += value * histogram[value]
+			mean_ink = sum_ink / weight_ink
+			mean_background = (total_sum - sum_ink) / weight_background
+			variance = weight_ink * weight_background * ((mean_ink - mean_background) ** 2)
+			if variance > best_variance:
+				(best_variance, best_threshold) = (variance, value + 1)
+		return best_threshold
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def threshold(self):
+		return self._threshold
+
+	@property
+	def data(self):
+		return self._data
+
+	def histogram(self):
+		return PIL.Image.frombytes("L", (self.width, self.height), self._data).histogram()
+
+	def get_row(self, y):
+		return self._data[y * self.width : (y + 1) * self.width]
+
+	def get_column(self, x):
+		return self._data[x :: self.width]
+
+	def column_empty(self, x):
+		column = self.get_column(x)
+		return column.count(255) == len(column)
+
+	def row_empty(self, y):
+		row = self.get_row(y)
+		return row.count(255) == len(row)
+
+	def get_area(self, x, y, width, height):
+		return b"".join(self._data[(row_y * self.width) + x : (row_y * self.width) + x + width] for row_y in range(y, y + height))
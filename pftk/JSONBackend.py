@@ -0,0 +1,44 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import json
+import importlib
+
+# Parsing of native font files is dominated by JSON decoding; use a faster
+# parser if one is installed. All of them accept bytes and produce the same
+# objects as the standard library for the data written by pftk.
+_BACKENDS = [ "orjson", "ujson", "rapidjson" ]
+
+def _find_backend():
+	for module_name in _BACKENDS:
+		try:
+			return importlib.import_module(module_name)
+		except ImportError:
+			pass
+	return json
+
+_backend = _find_backend()
+
+def backend_name():
+	return _backend.__name__
+
+def loads(data):
+	return _backend.loads(data)
@@ -0,0 +1,78 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .Canvas import Canvas
+
+class Marquee(object):
+	def __init__(self, font, text, width, height, baseline = None, step = 1, lead_in = True, lead_out = True):
+		assert(step > 0)
+		self._font = font
+		self._text = text
+		self._width = width
+		self._height = height
+		self._baseline = baseline if (baseline is not None) else self._default_baseline()
+		self._step = step
+		self._lead_in = lead_in
+		self._lead_out = lead_out
+		self._lookahead = max((max(-glyph.xoffset, glyph.xoffset + glyph.width) for glyph in font.get_all_glyphs()), default = 0) + 1
+
+	def _default_baseline(self):
+		below_baseline = max((glyph.yoffset + glyph.height for glyph in self._font.get_all_glyphs()), default = 0)
+		return self._height - max(below_baseline, 0)
+
+	def __iter__(self):
+		# The text is rendered once into a strip only slightly wider than the
+		# display; glyphs are added at the right as they approach the window
+		# and columns that have scrolled out are dropped at the left.
+		strip = Canvas(self._width + (3 * self._lookahead) + self._step, self._height)
+		strip_origin = -self._lookahead
+		pen = self._width if self._lead_in else 0
+		window = 0
+		chars = iter(self._text)
+		previous = None
+		exhausted = False
+		while True:
+			while (not exhausted) and (pen < window + self._width + self._lookahead):
+				char = next(chars, None)
+				if char is None:
+					exhausted = True
+				else:
+					glyph = self._font.get_glyph(char)
+					if glyph is None:
+						previous = None
+					else:
+						if previous is not None:
+							pen += self._font.get_kerning(previous, char)
+						previous = char
+						strip.blit(glyph, pen - strip_origin, self._baseline)
+						pen += glyph.xadvance
+
+			if exhausted:
+				limit = pen if self._lead_out else max(pen - self._width, 0) + 1
+				if window >= limit:
+					break
+
+			yield strip.crop(window - strip_origin, 0, self._width, self._height)
+			window += self._step
+			if window - strip_origin > self._lookahead:
+				shift = window - strip_origin - self._lookahead
+				strip.scroll_left(shift)
+				strip_origin += shift
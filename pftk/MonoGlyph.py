@@ -0,0 +1,134 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .Glyph import Glyph, BitmapGlyph
+
+class MonoGlyph(Glyph):
+	# Two-color glyph (pixels either 0 or 255) stored as one integer per row,
+	# bit x set if pixel x is ink.
+	def __init__(self, codepoint, width, height, xoffset, yoffset, xadvance, rows, precise_xadvance = None):
+		assert(len(rows) == height)
+		mask = (1 << width) - 1
+		self._codepoint = codepoint
+		self._width = width
+		self._height = height
+		self._xoffset = xoffset
+		self._yoffset = yoffset
+		self._xadvance = xadvance
+		self._precise_xadvance = self._fractional_advance(xadvance, precise_xadvance)
+		self._rows = tuple(row & mask for row in rows)
+		self._raw_data = None
+
+	@staticmethod
+	def is_representable(glyph):
+		return len(bytes(glyph.raw_data).translate(None, b"\x00\xff")) == 0
+
+	@classmethod
+	def from_glyph(cls, glyph):
+		assert(cls.is_representable(glyph))
+		return cls(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = glyph.xadvance, rows = glyph.get_rows(), precise_xadvance = glyph.precise_xadvance)
+
+	@classmethod
+	def from_rows(cls, codepoint, width, rows, xoffset, yoffset, xadvance, precise_xadvance = None):
+		return cls(codepoint = codepoint, width = width, height = len(rows), xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, rows = rows, precise_xadvance = precise_xadvance)
+
+	@property
+	def rows(self):
+		return self._rows
+
+	@property
+	def two_color(self):
+		return True
+
+	@property
+	def colors(self):
+		ink_pixels = sum(bin(row).count("1") for row in self._rows)
+		return int(ink_pixels > 0) + int(ink_pixels < self.width * self.height)
+
+	@property
+	def raw_data(self):
+		if self._raw_data is None:
+			self._raw_data = Glyph.from_rows(self.codepoint, self.width, self._rows, self.xoffset, self.yoffset, self.xadvance).raw_data
+		return self._raw_data
+
+	def get_pixel(self, x, y):
+		assert(0 <= x < self.width)
+		assert(0 <= y < self.height)
+		return 0 if ((self._rows[y] >> x) & 1) else 255
+
+	def get_rows(self, threshold = 255):
+		if threshold > 255:
+			return [ (1 << self.width) - 1 ] * self.height
+		elif threshold > 0:
+			return list(self._rows)
+		else:
+			return [ 0 ] * self.height
+
+	def iter_set_pixels(self, threshold = 255, mode = "real", ref = (0, 0)):
+		assert(mode in [ "real", "virtual" ])
+		if mode == "real":
+			(dx, dy) = ref
+		else:
+			(dx, dy) = (self.xoffset + ref[0], self.yoffset + ref[1])
+		for (y, row) in enumerate(self.get_rows(threshold = threshold)):
+			while row:
+				lowest_bit = row & -row
+				yield (lowest_bit.bit_length() - 1 + dx, y + dy)
+				row ^= lowest_bit
+
+	def find_extents(self):
+		union = 0
+		for row in self._rows:
+			union |= row
+		if union == 0:
+			return self._GlyphExtents(minx = None, maxx = None, miny = None, maxy = None)
+		miny = next(y for (y, row) in enumerate(self._rows) if row)
+		maxy = next(y for y in reversed(range(self.height)) if self._rows[y])
+		return self._GlyphExtents(minx = (union & -union).bit_length() - 1, maxx = union.bit_length() - 1, miny = miny, maxy = maxy)
+
+	def optimize(self):
+		extents = self.find_extents()
+		if extents.minx is None:
+			return MonoGlyph(codepoint = self.codepoint, width = 0, height = 0, xoffset = 0, yoffset = 0, xadvance = self.xadvance, rows = [ ], precise_xadvance = self.precise_xadvance)
+		rows = [ row >> extents.minx for row in self._rows[extents.miny : extents.maxy + 1] ]
+		return MonoGlyph(codepoint = self.codepoint, width = extents.maxx - extents.minx + 1, height = len(rows), xoffset = self.xoffset + extents.minx, yoffset = self.yoffset + extents.miny, xadvance = self.xadvance, rows = rows, precise_xadvance = self.precise_xadvance)
+
+	def get_bitmap(self, threshold = 255, mode = "xbit"):
+		rows = self.get_rows(threshold = threshold)
+		if mode == "xbit":
+			stride = (self.width + 7) // 8
+			data = b"".join(row.to_bytes(stride, "little") for row in rows)
+		elif mode == "ybit":
+			# Transpose rows into columns, bit y of each column is pixel y
+			stride = (self.height + 7) // 8
+			row_format = "0%db" % (self.width)
+			row_strings = [ format(row, row_format)[::-1] for row in rows ]
+			if (self.width == 0) or (self.height == 0):
+				# format() renders a zero width row as "0", not as empty string
+				data = bytes(self.width * stride)
+			else:
+				data = b"".join(int("".join(column)[::-1], 2).to_bytes(stride, "little") for column in zip(*row_strings))
+		else:
+			raise NotImplementedError(mode)
+		return BitmapGlyph(glyph = self, mode = mode, data = data)
+
+	def __str__(self):
+		return "MonoGlyph<\"%s\", %d x %d, %d rows>" % (self.codepoint, self.width, self.height, len(self._rows))
@@ -0,0 +1,184 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import io
+import zlib
+import struct
+import PIL.Image
+
+class PNGStripReader(object):
+	# Decodes a non-interlaced PNG a strip of rows at a time, so that only one
+	# strip is ever held in memory. The image data is inflated incrementally;
+	# undoing the scanline filters is left to PIL by wrapping each strip into
+	# a PNG of its own. Its first row is the previous, already unfiltered
+	# scanline stored without filter, so that the filters of the first strip
+	# row see the correct predecessor. To get at the raw scanline bytes, that
+	# PNG describes them as 8-bit pixels with the same number of bytes per
+	# pixel, which the filters are defined on.
+	_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+	_CHUNK_HEADER = struct.Struct(">L4s")
+	_IHDR = struct.Struct(">LLBBBBB")
+
+	# (bit depth, color type) -> (mode, rawmode); 16-bit color is missing
+	# since PIL keeps only the high bytes, which are not enough to undo the
+	# filters of the following strip
+	_MODES = {
+		(1, 0):		("1", "1"),
+		(2, 0):		("L", "L;2"),
+		(4, 0):		("L", "L;4"),
+		(8, 0):		("L", "L"),
+		(16, 0):	("I;16", "I;16B"),
+		(8, 2):		("RGB", "RGB"),
+		(1, 3):		("P", "P;1"),
+		(2, 3):		("P", "P;2"),
+		(4, 3):		("P", "P;4"),
+		(8, 3):		("P", "P"),
+		(8, 4):		("LA", "LA"),
+		(16, 4):	("RGBA", "LA;16B"),
+		(8, 6):		("RGBA", "RGBA"),
+	}
+	_CHANNELS = { 0: 1, 2: 3, 3: 1, 4: 2, 6: 4 }
+
+	# Bytes per pixel -> color type of an 8-bit image with that pixel size
+	_RAW_COLOR_TYPES = { 1: 0, 2: 4, 3: 2, 4: 6 }
+
+	def __init__(self, filename):
+		self._filename = filename
+		self._palette = None
+		self._transparency = None
+		with open(self._filename, "rb") as f:
+			if f.read(len(self._SIGNATURE)) != self._SIGNATURE:
+				raise Exception("%s is not a PNG file." % (self._filename))
+			for (chunk_type, data) in self._iter_chunks(f):
+				if chunk_type == b"IHDR":
+					(self._width, self._height, self._bit_depth, self._color_type, _, _, self._interlace) = self._IHDR.unpack(data)
+				elif chunk_type == b"PLTE":
+					self._palette = data
+				elif chunk_type == b"tRNS":
+					self._transparency = data
+				elif chunk_type == b"IDAT":
+					break
+		if self._interlace != 0:
+			raise Exception("%s is interlaced and cannot be decoded in strips." % (self._filename))
+		if (self._bit_depth, self._color_type) not in self._MODES:
+			raise Exception("%s has %d-bit color type %d, which cannot be decoded in strips." % (self._filename, self._bit_depth, self._color_type))
+		(self._mode, self._rawmode) = self._MODES[(self._bit_depth, self._color_type)]
+		bits_per_pixel = self._CHANNELS[self._color_type] * self._bit_depth
+		self._stride = ((self._width * bits_per_pixel) + 7) // 8
+		self._bytes_per_pixel = max(bits_per_pixel // 8, 1)
+
+	@classmethod
+	def open(cls, filename):
+		# Returns None for files that cannot be decoded in strips
+		try:
+			return cls(filename)
+		except Exception:
+			return None
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def mode(self):
+		return self._mode
+
+	def _iter_chunks(self, f):
+		while True:
+			header = f.read(self._CHUNK_HEADER.size)
+			if len(header) < self._CHUNK_HEADER.size:
+				return
+			(length, chunk_type) = self._CHUNK_HEADER.unpack(header)
+			data = f.read(length)
+			f.read(4)
+			yield (chunk_type, data)
+
+	def _iter_image_data(self):
+		with open(self._filename, "rb") as f:
+			f.read(len(self._SIGNATURE))
+			for (chunk_type, data) in self._iter_chunks(f):
+				if chunk_type == b"IDAT":
+					yield data
+
+	@staticmethod
+	def _chunk(chunk_type, data):
+		return struct.pack(">L", len(data)) + chunk_type + data + struct.pack(">L", zlib.crc32(chunk_type + data))
+
+	def _unfilter(self, previous_row, filtered_rows, row_count):
+		raw_width = self._stride // self._bytes_per_pixel
+		header = self._IHDR.pack(raw_width, row_count + 1, 8, self._RAW_COLOR_TYPES[self._bytes_per_pixel], 0, 0, 0)
+		image_data = zlib.compress(b"\x00" + previous_row + filtered_rows, 1)
+		png_data = self._SIGNATURE + self._chunk(b"IHDR", header) + self._chunk(b"IDAT", image_data) + self._chunk(b"IEND", b"")
+		return PIL.Image.open(io.BytesIO(png_data)).tobytes()[self._stride : ]
+
+	def _to_image(self, raw_rows, row_count):
+		img = PIL.Image.frombytes(self._mode, (self._width, row_count), raw_rows, "raw", self._rawmode)
+		if self._palette is not None and (self._mode == "P"):
+			img.putpalette(self._palette)
+		if self._transparency is not None:
+			if self._color_type == 3:
+				img.info["transparency"] = self._transparency
+			elif self._color_type == 0:
+				img.info["transparency"] = struct.unpack(">H", self._transparency[:2])[0]
+			elif self._color_type == 2:
+				img.info["transparency"] = struct.unpack(">HHH", self._transparency[:6])
+		return img
+
+	def iter_strips(self, strip_height):
+		# Yields (y, image) for consecutive strips of at most strip_height rows
+		row_length = 1 + self._stride
+		image_data = self._iter_image_data()
+		inflater = zlib.decompressobj()
+		pending = bytearray()
+		previous_row = bytes(self._stride)
+		for y in range(0, self._height, strip_height):
+			row_count = min(strip_height, self._height - y)
+			needed = row_count * row_length
+			while len(pending) < needed:
+				if len(inflater.unconsumed_tail) > 0:
+					data = inflater.unconsumed_tail
+				else:
+					data = next(image_data, None)
+					if data is None:
+						raise Exception("%s: image data ends after %d of %d rows." % (self._filename, y + (len(pending) // row_length), self._height))
+				pending += inflater.decompress(data, needed - len(pending))
+			raw_rows = self._unfilter(previous_row, bytes(pending[:needed]), row_count)
+			del pending[:needed]
+			previous_row = raw_rows[-self._stride:] if (self._stride > 0) else previous_row
+			yield (y, self._to_image(raw_rows, row_count))
+
+	def crop_columns(self, x0, x1, strip_height):
+		# Full-height image of the column range [x0, x1); since scanlines can
+		# only be decoded from the top, this reads the whole file once
+		band = None
+		for (y, strip) in self.iter_strips(strip_height):
+			strip = strip.crop((x0, 0, x1, strip.height))
+			if band is None:
+				band = PIL.Image.new(strip.mode, (x1 - x0, self._height))
+				if strip.mode == "P":
+					band.putpalette(strip.getpalette())
+				band.info = dict(strip.info)
+			band.paste(strip, (0, y))
+		return band
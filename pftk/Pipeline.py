@@ -0,0 +1,84 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import shlex
+import collections
+
+class Pipeline(object):
+	_Stage = collections.namedtuple("Stage", [ "name", "cmdline", "action" ])
+
+	# Stages are regular commands; the font file arguments they would read or
+	# write are filled in with placeholders since the font is passed in memory.
+	_FONT_ARGUMENTS = {
+		"import":		[ "-o", "-" ],
+		"import-ttf":	[ "-o", "-" ],
+		"manipulate":	[ "-i", "-", "-o", "-" ],
+		"convert":		[ "-" ],
+		"draw":			[ "-" ],
+		"marquee":		[ "-" ],
+		"specimen":		[ "-" ],
+	}
+	_IMPORT_STAGES = [ "import", "import-ttf" ]
+	_OUTPUT_STAGES = [ "convert", "draw", "marquee", "specimen" ]
+
+	def __init__(self, multicommand = None):
+		if multicommand is None:
+			# Imported here since the command table itself refers to the
+			# pipeline command
+			from .Commands import create_multicommand
+			multicommand = create_multicommand()
+		self._mc = multicommand
+		self._stages = [ ]
+
+	@property
+	def stages(self):
+		return iter(self._stages)
+
+	def add_stage(self, cmdline):
+		if isinstance(cmdline, str):
+			cmdline = shlex.split(cmdline)
+		if (len(cmdline) == 0) or (cmdline[0] not in self._FONT_ARGUMENTS):
+			raise Exception("Invalid pipeline stage '%s': must be one of %s." % (" ".join(cmdline), ", ".join(sorted(self._FONT_ARGUMENTS))))
+		try:
+			parse_result = self._mc.parse(cmdline + self._FONT_ARGUMENTS[cmdline[0]], silent = True)
+		except Exception as e:
+			raise Exception("Invalid pipeline stage '%s': %s" % (" ".join(cmdline), str(e)))
+		action = parse_result.cmd.action(parse_result.cmd.name, parse_result.args, run = False)
+		self._stages.append(self._Stage(name = parse_result.cmd.name, cmdline = cmdline, action = action))
+
+	def add_stages_from_file(self, filename):
+		with open(filename) as f:
+			for line in f:
+				cmdline = shlex.split(line, comments = True)
+				if len(cmdline) > 0:
+					self.add_stage(cmdline)
+
+	def run(self, font = None, checkpoint_dir = None, verbose = 0):
+		for (stageno, stage) in enumerate(self._stages, 1):
+			if verbose >= 1:
+				print("Stage %d: %s" % (stageno, " ".join(stage.cmdline)))
+			if (font is None) and (stage.name not in self._IMPORT_STAGES):
+				raise Exception("Pipeline stage %d (%s) requires a font, but no font was loaded or imported before." % (stageno, stage.name))
+			font = stage.action.process(font)
+			if (checkpoint_dir is not None) and (stage.name not in self._OUTPUT_STAGES):
+				font.save_to_file(os.path.join(checkpoint_dir, "%02d_%s.json" % (stageno, stage.name)))
+		return font
@@ -28,6 +28,8 @@ class PrefixMatcher():
 		self._opts = options
 
 	def matchunique(self, value):
+		if value in self._opts:
+			return value
 		result = self.match(value)
 		if len(result) != 1:
 			if len(result) == 0:
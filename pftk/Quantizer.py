@@ -0,0 +1,113 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import enum
+import PIL.Image
+from .Glyph import Glyph
+
+class DitherMethod(enum.Enum):
+	NoDither = "none"
+	Bayer2 = "bayer2"
+	Bayer4 = "bayer4"
+	Bayer8 = "bayer8"
+	FloydSteinberg = "floyd-steinberg"
+
+class Quantizer(object):
+	_BAYER_SIZES = {
+		DitherMethod.Bayer2:	2,
+		DitherMethod.Bayer4:	4,
+		DitherMethod.Bayer8:	8,
+	}
+
+	def __init__(self, levels, method = DitherMethod.NoDither):
+		if not (2 <= levels <= 256):
+			raise ValueError("Number of gray levels must be between 2 and 256, %d given." % (levels))
+		self._levels = levels
+		self._method = method
+		self._values = [ round(level * 255 / (levels - 1)) for level in range(levels) ]
+		if method in self._BAYER_SIZES:
+			self._size = self._BAYER_SIZES[method]
+			matrix = self.bayer_matrix(self._size)
+			self._tables = [ [ self._table((matrix[y][x] + 0.5) / (self._size * self._size)) for x in range(self._size) ] for y in range(self._size) ]
+		else:
+			self._size = 1
+			self._tables = [ [ self._table(0.5) ] ]
+		if method == DitherMethod.FloydSteinberg:
+			# Palette of the target values, padded to the full 256 entries by
+			# repeating the last one; index_table maps indices back to values
+			entries = self._values + ([ self._values[-1] ] * (256 - levels))
+			self._palette = PIL.Image.new("P", (1, 1))
+			self._palette.putpalette([ component for value in entries for component in (value, value, value) ])
+			self._index_table = bytes(entries)
+
+	@property
+	def levels(self):
+		return self._levels
+
+	@property
+	def method(self):
+		return self._method
+
+	@staticmethod
+	def bayer_matrix(size):
+		matrix = [ [ 0 ] ]
+		while len(matrix) < size:
+			n = len(matrix)
+			matrix = [ [ 4 * matrix[y % n][x % n] + [ [ 0, 2 ], [ 3, 1 ] ][y // n][x // n] for x in range(2 * n) ] for y in range(2 * n) ]
+		return matrix
+
+	def _table(self, bias):
+		# Maps each gray value to its quantized value for one dither phase
+		table = bytearray(256)
+		for value in range(256):
+			level = min(int((value * (self._levels - 1) / 255) + bias), self._levels - 1)
+			table[value] = self._values[level]
+		return bytes(table)
+
+	def _quantize_ordered(self, width, height, data):
+		result = bytearray(len(data))
+		for y in range(height):
+			offset = y * width
+			row = data[offset : offset + width]
+			tables = self._tables[y % self._size]
+			for phase in range(min(self._size, width)):
+				result[offset + phase : offset + width : self._size] = row[phase :: self._size].translate(tables[phase])
+		return bytes(result)
+
+	def _quantize_floyd_steinberg(self, width, height, data):
+		# Error diffusion is inherently sequential along each row, so it is
+		# left to PIL's C implementation. Dithering to a palette only works
+		# from RGB, not from a gray image.
+		if len(data) == 0:
+			return bytes()
+		img = PIL.Image.frombytes("L", (width, height), bytes(data)).convert("RGB")
+		indices = img.quantize(palette = self._palette, dither = PIL.Image.Dither.FLOYDSTEINBERG).tobytes()
+		return indices.translate(self._index_table)
+
+	def quantize(self, width, height, data):
+		if self._method == DitherMethod.FloydSteinberg:
+			return self._quantize_floyd_steinberg(width, height, data)
+		else:
+			return self._quantize_ordered(width, height, bytes(data))
+
+	def quantize_glyph(self, glyph):
+		raw_data = self.quantize(glyph.width, glyph.height, glyph.raw_data)
+		return Glyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = glyph.xadvance, raw_data = raw_data, precise_xadvance = glyph.precise_xadvance)
@@ -0,0 +1,335 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import json
+import collections
+from .TextRenderer import TextRenderer
+
+# Straightforward per-pixel implementations of the glyph, text and conversion
+# code paths as they were before any optimization work. They are slow and
+# deliberately kept simple; the self check compares the optimized code
+# against them.
+
+class ReferenceBitmapGlyph(object):
+	def __init__(self, glyph, mode = "xbit"):
+		assert(mode in [ "xbit", "ybit" ])
+		self._glyph = glyph
+		self._mode = mode
+		if self._mode == "xbit":
+			self._width = (self._glyph.width + 7) // 8
+			self._height = self._glyph.height
+		else:
+			self._width = self._glyph.width
+			self._height = (self._glyph.height + 7) // 8
+		self._data = bytearray(self._width * self._height)
+
+	@classmethod
+	def create_from_glyph(cls, glyph, threshold, mode = "xbit"):
+		bitmap = cls(glyph = glyph, mode = mode)
+		for (x, y) in glyph.iter_set_pixels(threshold = threshold):
+			bitmap.set_pixel(x, y)
+		return bitmap
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def data(self):
+		return bytes(self._data)
+
+	def _get_offset_bit(self, x, y):
+		assert(0 <= x < self._glyph.width)
+		assert(0 <= y < self._glyph.height)
+		if self._mode == "xbit":
+			byte_offset = (x // 8) + (y * self._width)
+			bit_offset = x % 8
+		elif self._mode == "ybit":
+			byte_offset = (y // 8) + (x * self._height)
+			bit_offset = y % 8
+		else:
+			raise NotImplementedError(self._mode)
+		return (byte_offset, bit_offset)
+
+	def set_pixel(self, x, y):
+		(byte_offset, bit_offset) = self._get_offset_bit(x, y)
+		self._data[byte_offset] |= (1 << bit_offset)
+
+class ReferenceGlyph(object):
+	_GlyphExtents = collections.namedtuple("GlyphExtents", [ "minx", "maxx", "miny", "maxy" ])
+
+	def __init__(self, codepoint, width, height, xoffset, yoffset, xadvance, raw_data):
+		assert(len(raw_data) == width * height)
+		self._codepoint = codepoint
+		self._width = width
+		self._height = height
+		self._xoffset = xoffset
+		self._yoffset = yoffset
+		self._xadvance = xadvance
+		self._raw_data = bytes(raw_data)
+
+	@classmethod
+	def from_glyph(cls, glyph):
+		return cls(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = glyph.xadvance, raw_data = bytes(glyph.raw_data))
+
+	@property
+	def colors(self):
+		return len(set(self._raw_data))
+
+	@property
+	def codepoint(self):
+		return self._codepoint
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def xoffset(self):
+		return self._xoffset
+
+	@property
+	def yoffset(self):
+		return self._yoffset
+
+	@property
+	def xadvance(self):
+		return self._xadvance
+
+	@property
+	def raw_data(self):
+		return self._raw_data
+
+	def get_pixel(self, x, y):
+		assert(0 <= x < self.width)
+		assert(0 <= y < self.height)
+		return self._raw_data[(y * self.width) + x]
+
+	def iter_set_pixels(self, threshold = 255, mode = "real", ref = (0, 0)):
+		assert(mode in [ "real", "virtual" ])
+		for y in range(self.height):
+			for x in range(self.width):
+				pixel = self.get_pixel(x, y)
+				if pixel < threshold:
+					# Pixel is set
+					if mode == "real":
+						yield (x + ref[0], y + ref[1])
+					elif mode == "virtual":
+						yield (x + self.xoffset + ref[0], y + self.yoffset + ref[1])
+					else:
+						raise NotImplementedError(mode)
+
+	def iter_area(self, xoffset, yoffset, width, height):
+		assert(width >= 0)
+		assert(height >= 0)
+		if (width == 0) or (height == 0):
+			return
+		assert(xoffset + width <= self.width)
+		assert(yoffset + height <= self.height)
+		for y in range(height):
+			for x in range(width):
+				pixel = self.get_pixel(x + xoffset, y + yoffset)
+				yield (x + xoffset, y + yoffset, pixel)
+
+	def find_extents(self):
+		(minx, maxx, miny, maxy) = (None, None, None, None)
+		for (x, y) in self.iter_set_pixels(threshold = 255):
+			if (minx is None) or (x < minx):
+				minx = x
+			if (maxx is None) or (x > maxx):
+				maxx = x
+			if (miny is None) or (y < miny):
+				miny = y
+			if (maxy is None) or (y > maxy):
+				maxy = y
+		return self._GlyphExtents(minx = minx, maxx = maxx, miny = miny, maxy = maxy)
+
+	def optimize(self):
+		extents = self.find_extents()
+		if extents.minx is not None:
+			new_width = extents.maxx - extents.minx + 1
+			new_height = extents.maxy - extents.miny + 1
+			raw_data = bytearray(new_width * new_height)
+			for (x, y, pixel) in self.iter_area(extents.minx, extents.miny, new_width, new_height):
+				offset = ((y - extents.miny) * new_width) + (x - extents.minx)
+				raw_data[offset] = pixel
+			raw_data = bytes(raw_data)
+			new_glyph = ReferenceGlyph(codepoint = self.codepoint, width = new_width, height = new_height, xoffset = self.xoffset + extents.minx, yoffset = self.yoffset + extents.miny, xadvance = self.xadvance, raw_data = raw_data)
+		else:
+			new_glyph = ReferenceGlyph(codepoint = self.codepoint, width = 0, height = 0, xoffset = 0, yoffset = 0, xadvance = self.xadvance, raw_data = bytes())
+		return new_glyph
+
+	def get_bitmap(self, threshold = 255, mode = "xbit"):
+		return ReferenceBitmapGlyph.create_from_glyph(glyph = self, threshold = threshold, mode = mode)
+
+	def print_data(self, f, mode = "values"):
+		assert(mode in [ "values", "dots" ])
+		dot = "⬤ "
+		charspace = {
+			"values":	" ",
+			"dots":		"",
+		}[mode]
+		for y in range(self.height):
+			line = [ ]
+			for x in range(self.width):
+				if mode == "values":
+					value = "%3d" % (self.get_pixel(x, y))
+				elif mode == "dots":
+					value = dot if (self.get_pixel(x, y) == 0) else "  "
+				else:
+					raise NotImplementedError(mode)
+				line.append(value)
+			print(charspace.join(line), file = f)
+
+	def __str__(self):
+		return "Glyph<\"%s\", %d x %d, %d bytes>" % (self.codepoint, self.width, self.height, len(self.raw_data))
+
+class ReferenceFont(TextRenderer):
+	def __init__(self, font):
+		self._name = font.name
+		self._glyphs = { codepoint: ReferenceGlyph.from_glyph(glyph) for (codepoint, glyph) in font }
+
+	@property
+	def name(self):
+		return self._name
+
+	@property
+	def colors(self):
+		return max(glyph.colors for glyph in self._glyphs.values())
+
+	def get_glyph(self, codepoint):
+		return self._glyphs.get(codepoint)
+
+	def get_text_extents(self, text):
+		missing_glyphs = set()
+		missing_glyph_count = 0
+		posx = 0
+		max_y_above = 0
+		max_y_below = 0
+		for char in text:
+			glyph = self._glyphs.get(char)
+			if glyph is None:
+				missing_glyph_count += 1
+				missing_glyphs.add(char)
+			else:
+				for (x, y) in glyph.iter_set_pixels(mode = "virtual"):
+					if y <= 0:
+						# Above baseline
+						max_y_above = max(max_y_above, abs(y))
+					else:
+						# Below baseline
+						max_y_below = max(max_y_below, y)
+				posx += glyph.xadvance
+		return self._TextExtents(width = posx, height = max_y_above + max_y_below, height_above_baseline = max_y_above, height_below_baseline = max_y_below, missing_glyphs = missing_glyphs, missing_glyph_count = missing_glyph_count)
+
+	def write(self, text, posx, posy, callback_put_pixel = None, callback_missing_glyph = None, callback_start_draw = None, callback_end_draw = None):
+		for char in text:
+			glyph = self._glyphs.get(char)
+			if glyph is None:
+				if callback_missing_glyph is not None:
+					callback_missing_glyph()
+			else:
+				if callback_start_draw is not None:
+					callback_start_draw(posx, posy)
+				for (x, y) in glyph.iter_set_pixels(mode = "virtual", ref = (posx, posy)):
+					if callback_put_pixel is not None:
+						callback_put_pixel(x, y)
+				posx += glyph.xadvance
+				if callback_end_draw is not None:
+					callback_end_draw(posx, posy)
+
+	def render(self, text, width, height, posx, posy):
+		# Canvas contents as produced by drawing every glyph pixel by pixel;
+		# overlapping pixels keep the darker value
+		data = bytearray([ 255 ]) * (width * height)
+		for char in text:
+			glyph = self._glyphs.get(char)
+			if glyph is not None:
+				for y in range(glyph.height):
+					for x in range(glyph.width):
+						(cx, cy) = (posx + glyph.xoffset + x, posy + glyph.yoffset + y)
+						if (0 <= cx < width) and (0 <= cy < height):
+							offset = (cy * width) + cx
+							data[offset] = min(data[offset], glyph.get_pixel(x, y))
+				posx += glyph.xadvance
+		return bytes(data)
+
+	def __iter__(self):
+		return iter(sorted(self._glyphs.items()))
+
+	def __len__(self):
+		return len(self._glyphs)
+
+class ReferenceConverter(object):
+	def __init__(self, font, no_optimize = False):
+		self._font = font
+		self._no_optimize = no_optimize
+
+	def _convert_ascii(self, f):
+		print("# Font: %s, %d glyphs" % (self._font.name, len(self._font)), file = f)
+		print(file = f)
+		print_mode = "dots" if (self._font.colors == 2) else "values"
+		for (glyphno, (codepoint, glyph)) in enumerate(self._font):
+			print("# Glyph %d: \"%s\"" % (glyphno, codepoint), file = f)
+			glyph.print_data(f, mode = print_mode)
+			print(file = f)
+
+	def _convert_bitfontmaker(self, f):
+		bfmdata = {
+			"name":				self._font.name or "",
+			"copy":				"",
+			"letterspace":		"64",
+			"basefont_size":	"512",
+			"basefont_left":	"62",
+			"basefont_top":		"0",
+			"basefont":			"Arial",
+			"basefont2":		"",
+		}
+		for (codepoint, glyph) in self._font:
+			fontdata = [ 0 ] * 16
+			for (x, y) in glyph.iter_set_pixels():
+				fontdata[y + 11 + glyph.yoffset] |= (1 << (x + 2 + glyph.xoffset))
+			bfmdata[str(ord(codepoint))] = fontdata
+		json.dump(bfmdata, f)
+		f.write("\n")
+
+	def _convert_python(self, f):
+		print("from UDisplay import UDisplay", file = f)
+		print(file = f)
+		print("font_name = \"default\"", file = f)
+		for (codepoint, glyph) in self._font:
+			if not self._no_optimize:
+				glyph = glyph.optimize()
+			bitmap = glyph.get_bitmap(mode = "ybit")
+			glyph_data = ", ".join("0x%02x" % (x) for x in bitmap.data)
+			print("UDisplay.create_glyph(font_name, \"%s\", width = %d, height = %d, xoffset = %d, yoffset = %d, xadvance = %d, data = bytes((%s)))," % (codepoint, glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance, glyph_data), file = f)
+
+	def convert(self, output_format, f):
+		method = getattr(self, "_convert_" + output_format)
+		method(f)
@@ -0,0 +1,195 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .Glyph import Glyph
+from .TextRenderer import TextRenderer
+
+class RotatedGlyph(Glyph):
+	# Glyph turned clockwise by a multiple of 90 degrees. Since the baseline
+	# is no longer horizontal, the advance is a vector.
+	_ROTATIONS = (0, 90, 180, 270)
+
+	def __init__(self, codepoint, width, height, xoffset, yoffset, xadvance, yadvance, raw_data, precise_xadvance = None):
+		Glyph.__init__(self, codepoint = codepoint, width = width, height = height, xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, raw_data = raw_data, precise_xadvance = precise_xadvance)
+		self._yadvance = yadvance
+
+	@property
+	def yadvance(self):
+		return self._yadvance
+
+	@staticmethod
+	def rotate_vector(dx, dy, rotation):
+		# Clockwise in screen coordinates, i.e., with y pointing downwards
+		if rotation == 0:
+			return (dx, dy)
+		elif rotation == 90:
+			return (-dy, dx)
+		elif rotation == 180:
+			return (-dx, -dy)
+		elif rotation == 270:
+			return (dy, -dx)
+		else:
+			raise NotImplementedError(rotation)
+
+	@classmethod
+	def from_glyph(cls, glyph, rotation):
+		(width, height, data) = (glyph.width, glyph.height, bytes(glyph.raw_data))
+		(xadvance, yadvance) = cls.rotate_vector(glyph.xadvance, glyph.yadvance, rotation)
+		precise_xadvance = cls.rotate_vector(glyph.precise_xadvance, glyph.yadvance, rotation)[0]
+		if rotation == 0:
+			return cls(codepoint = glyph.codepoint, width = width, height = height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = xadvance, yadvance = yadvance, raw_data = data, precise_xadvance = precise_xadvance)
+		elif rotation == 90:
+			# Row y is column y of the original, read bottom to top
+			rows = [ data[y :: width][::-1] for y in range(width) ]
+			return cls(codepoint = glyph.codepoint, width = height, height = width, xoffset = -glyph.yoffset - height, yoffset = glyph.xoffset, xadvance = xadvance, yadvance = yadvance, raw_data = b"".join(rows), precise_xadvance = precise_xadvance)
+		elif rotation == 180:
+			return cls(codepoint = glyph.codepoint, width = width, height = height, xoffset = -glyph.xoffset - width, yoffset = -glyph.yoffset - height, xadvance = xadvance, yadvance = yadvance, raw_data = data[::-1], precise_xadvance = precise_xadvance)
+		elif rotation == 270:
+			# Row y is column (width - 1 - y) of the original, read top to bottom
+			rows = [ data[width - 1 - y :: width] for y in range(width) ]
+			return cls(codepoint = glyph.codepoint, width = height, height = width, xoffset = glyph.yoffset, yoffset = -glyph.xoffset - width, xadvance = xadvance, yadvance = yadvance, raw_data = b"".join(rows), precise_xadvance = precise_xadvance)
+		else:
+			raise NotImplementedError(rotation)
+
+	def optimize(self):
+		glyph = Glyph.optimize(self)
+		return RotatedGlyph(codepoint = glyph.codepoint, width = glyph.width, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = self.xadvance, yadvance = self.yadvance, raw_data = glyph.raw_data, precise_xadvance = self.precise_xadvance)
+
+	def __str__(self):
+		return "RotatedGlyph<\"%s\", %d x %d, advance %d, %d>" % (self.codepoint, self.width, self.height, self.xadvance, self.yadvance)
+
+class RotatedFont(TextRenderer):
+	# View of a font or font stack with all glyphs turned clockwise. Glyphs
+	# are rotated once on first use and then kept, so drawing rotated text is
+	# one blit per glyph just like upright text. Pen positions are given in
+	# canvas coordinates and advance along the rotated baseline.
+	def __init__(self, renderer, rotation):
+		assert(rotation in RotatedGlyph._ROTATIONS)
+		self._renderer = renderer
+		self._rotation = rotation
+		self._glyphs = { }
+
+	@property
+	def rotation(self):
+		return self._rotation
+
+	@property
+	def name(self):
+		return self._renderer.name
+
+	@property
+	def colors(self):
+		return self._renderer.colors
+
+	@staticmethod
+	def rotated_size(width, height, rotation):
+		if rotation in (90, 270):
+			return (height, width)
+		return (width, height)
+
+	@staticmethod
+	def transform_point(x, y, width, height, rotation):
+		# Maps a point on an upright canvas of the given size onto the same
+		# canvas turned clockwise
+		if rotation == 0:
+			return (x, y)
+		elif rotation == 90:
+			return (height - y, x)
+		elif rotation == 180:
+			return (width - x, height - y)
+		elif rotation == 270:
+			return (y, width - x)
+		else:
+			raise NotImplementedError(rotation)
+
+	@classmethod
+	def transform_pixel(cls, x, y, width, height, rotation):
+		# Pixel (x, y) covers the unit square with that corner; its rotated
+		# position is the smallest corner of the rotated square
+		(x0, y0) = cls.transform_point(x, y, width, height, rotation)
+		(x1, y1) = cls.transform_point(x + 1, y + 1, width, height, rotation)
+		return (min(x0, x1), min(y0, y1))
+
+	def get_glyph(self, codepoint):
+		glyph = self._glyphs.get(codepoint)
+		if glyph is None:
+			upright_glyph = self._renderer.get_glyph(codepoint)
+			if upright_glyph is None:
+				return None
+			glyph = RotatedGlyph.from_glyph(upright_glyph, self._rotation)
+			self._glyphs[codepoint] = glyph
+		return glyph
+
+	def get_kerning_vector(self, left, right):
+		return RotatedGlyph.rotate_vector(self._renderer.get_kerning(left, right), 0, self._rotation)
+
+	def get_text_extents(self, text):
+		# Extents along the baseline, i.e., of the unrotated text
+		return self._renderer.get_text_extents(text)
+
+	def write(self, text, posx, posy, callback_put_pixel = None, callback_missing_glyph = None, callback_start_draw = None, callback_end_draw = None):
+		previous = None
+		for char in text:
+			glyph = self.get_glyph(char)
+			if glyph is None:
+				if callback_missing_glyph is not None:
+					callback_missing_glyph()
+				previous = None
+			else:
+				if previous is not None:
+					(dx, dy) = self.get_kerning_vector(previous, char)
+					(posx, posy) = (posx + dx, posy + dy)
+				previous = char
+				if callback_start_draw is not None:
+					callback_start_draw(posx, posy)
+				for (x, y) in glyph.iter_set_pixels(mode = "virtual", ref = (posx, posy)):
+					if callback_put_pixel is not None:
+						callback_put_pixel(x, y)
+				(posx, posy) = (posx + glyph.xadvance, posy + glyph.yadvance)
+				if callback_end_draw is not None:
+					callback_end_draw(posx, posy)
+
+	def render(self, text, canvas, posx, posy):
+		previous = None
+		for char in text:
+			glyph = self.get_glyph(char)
+			if glyph is None:
+				previous = None
+			else:
+				if previous is not None:
+					(dx, dy) = self.get_kerning_vector(previous, char)
+					(posx, posy) = (posx + dx, posy + dy)
+				previous = char
+				canvas.blit(glyph, posx, posy)
+				(posx, posy) = (posx + glyph.xadvance, posy + glyph.yadvance)
+		return (posx, posy)
+
+	def get_all_glyphs(self):
+		return [ self.get_glyph(glyph.codepoint) for glyph in self._renderer.get_all_glyphs() ]
+
+	def __iter__(self):
+		return iter(sorted((glyph.codepoint, glyph) for glyph in self.get_all_glyphs()))
+
+	def __len__(self):
+		return len(self._renderer)
+
+	def __str__(self):
+		return "RotatedFont<%s, %d degrees>" % (str(self._renderer), self._rotation)
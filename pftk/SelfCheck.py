@@ -0,0 +1,211 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import io
+import os
+import time
+import random
+import tempfile
+import argparse
+import collections
+from .Font import Font
+from .Glyph import Glyph
+from .Canvas import Canvas
+from .TextLabel import TextLabel
+from .ActionConvert import ActionConvert
+from .Reference import ReferenceFont, ReferenceConverter
+
+class SelfCheck(object):
+	# Generates random fonts and compares the optimized glyph, text and
+	# conversion code paths against the pure Python reference
+	# implementations, timing both sides.
+	_Mismatch = collections.namedtuple("Mismatch", [ "check", "font_index", "detail" ])
+	_Throughput = collections.namedtuple("Throughput", [ "check", "calls", "fast_time", "reference_time" ])
+	_FONT_KINDS = [ "gray", "mono", "memoryview", "empty" ]
+	_GRAY_VALUES = [ 0, 1, 64, 127, 128, 200, 254, 255 ]
+	_THRESHOLDS = [ 0, 1, 128, 255, 256 ]
+	_CONVERT_FORMATS = [ "ascii", "bitfontmaker", "python" ]
+
+	def __init__(self, seed = None, verbose = 0):
+		self._seed = seed if (seed is not None) else random.randrange(1 << 32)
+		self._rng = random.Random(self._seed)
+		self._verbose = verbose
+		self._mismatches = [ ]
+		self._timing = collections.OrderedDict()
+		self._font_index = 0
+
+	@property
+	def seed(self):
+		return self._seed
+
+	@property
+	def mismatches(self):
+		return self._mismatches
+
+	@property
+	def throughput(self):
+		return [ self._Throughput(check = check, calls = calls, fast_time = fast_time, reference_time = reference_time) for (check, (calls, fast_time, reference_time)) in self._timing.items() ]
+
+	def _random_pixel_data(self, kind, pixel_count):
+		if kind == "empty":
+			return bytes([ 255 ]) * pixel_count
+		density = self._rng.random()
+		if kind == "gray":
+			return bytes(self._rng.choice(self._GRAY_VALUES) if (self._rng.random() < density) else 255 for _ in range(pixel_count))
+		else:
+			return bytes(0 if (self._rng.random() < density) else 255 for _ in range(pixel_count))
+
+	def random_font(self):
+		kind = self._rng.choice(self._FONT_KINDS)
+		font = Font(name = self._rng.choice([ None, "selfcheck-%s" % (kind) ]))
+		codepoints = self._rng.sample(range(0x21, 0x250), self._rng.randint(1, 24))
+		for codepoint in codepoints:
+			# Zero sizes, bitfontmaker-sized glyphs and wide glyphs which
+			# exceed a machine word are all covered
+			width = self._rng.choice([ 0, self._rng.randint(1, 8), self._rng.randint(1, 14), self._rng.randint(60, 72) ])
+			height = self._rng.choice([ 0, self._rng.randint(1, 5), self._rng.randint(1, 16) ])
+			raw_data = self._random_pixel_data(kind, width * height)
+			if kind == "memoryview":
+				raw_data = memoryview(raw_data).toreadonly()
+			xoffset = self._rng.randint(-3, 3)
+			yoffset = self._rng.randint(-12, 4)
+			xadvance = self._rng.randint(0, width + 4)
+			font.add_glyph(Glyph(codepoint = chr(codepoint), width = width, height = height, xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, raw_data = raw_data))
+		if kind == "mono":
+			font.use_mono_glyphs()
+		if self._rng.random() < 0.5:
+			# Round trip through the lazily decoding loader
+			font = Font.deserialize(font.serialize(), lazy = True)
+		return font
+
+	def _random_text(self, font):
+		# Includes characters which are not present in the font
+		alphabet = [ codepoint for (codepoint, glyph) in font ] + [ " ", "☃" ]
+		return "".join(self._rng.choice(alphabet) for _ in range(self._rng.randint(0, 32)))
+
+	@staticmethod
+	def _outcome(function):
+		try:
+			return function()
+		except Exception as e:
+			return ("exception", e.__class__.__name__)
+
+	@staticmethod
+	def _glyph_outcome(glyph):
+		return (glyph.codepoint, glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance, bytes(glyph.raw_data))
+
+	def _compare(self, check, fast_function, reference_function, detail):
+		t0 = time.perf_counter()
+		fast_result = self._outcome(fast_function)
+		t1 = time.perf_counter()
+		reference_result = self._outcome(reference_function)
+		t2 = time.perf_counter()
+		(calls, fast_time, reference_time) = self._timing.get(check, (0, 0, 0))
+		self._timing[check] = (calls + 1, fast_time + (t1 - t0), reference_time + (t2 - t1))
+		if fast_result != reference_result:
+			self._fail(check, detail)
+
+	def _fail(self, check, detail):
+		self._mismatches.append(self._Mismatch(check = check, font_index = self._font_index, detail = detail))
+		if self._verbose >= 1:
+			print("Mismatch in %s, font %d: %s" % (check, self._font_index, detail))
+
+	def _check_glyph(self, glyph, ref_glyph):
+		for threshold in self._THRESHOLDS:
+			ref = (self._rng.randint(-20, 20), self._rng.randint(-20, 20))
+			for mode in [ "real", "virtual" ]:
+				self._compare("iter_set_pixels", lambda: list(glyph.iter_set_pixels(threshold = threshold, mode = mode, ref = ref)), lambda: list(ref_glyph.iter_set_pixels(threshold = threshold, mode = mode, ref = ref)), "%s threshold %d mode %s" % (glyph, threshold, mode))
+			for mode in [ "xbit", "ybit" ]:
+				self._compare("get_bitmap", lambda: (lambda bitmap: (bitmap.width, bitmap.height, bitmap.data))(glyph.get_bitmap(threshold = threshold, mode = mode)), lambda: (lambda bitmap: (bitmap.width, bitmap.height, bitmap.data))(ref_glyph.get_bitmap(threshold = threshold, mode = mode)), "%s threshold %d mode %s" % (glyph, threshold, mode))
+		self._compare("find_extents", lambda: tuple(glyph.find_extents()), lambda: tuple(ref_glyph.find_extents()), str(glyph))
+		self._compare("optimize", lambda: self._glyph_outcome(glyph.optimize()), lambda: self._glyph_outcome(ref_glyph.optimize()), str(glyph))
+
+		# Properties which must hold independently of the reference
+		ink = set(glyph.iter_set_pixels(mode = "virtual"))
+		if len(ink) > 0:
+			optimized = glyph.optimize()
+			if set(optimized.iter_set_pixels(mode = "virtual")) != ink:
+				self._fail("optimize", "%s: optimized glyph changes ink pixels" % (glyph))
+			if tuple(optimized.find_extents()) != (0, optimized.width - 1, 0, optimized.height - 1):
+				self._fail("optimize", "%s: optimized glyph is not tight" % (glyph))
+		if len(ink) != len(bytes(glyph.raw_data).translate(None, b"\xff")):
+			self._fail("iter_set_pixels", "%s: set pixel count differs from raw data" % (glyph))
+
+	def _check_text(self, font, ref_font):
+		text = self._random_text(font)
+		self._compare("get_text_extents", lambda: tuple(font.get_text_extents(text)), lambda: tuple(ref_font.get_text_extents(text)), repr(text))
+
+		def record_write(renderer):
+			calls = [ ]
+			renderer.write(text, 7, 11, callback_put_pixel = lambda x, y: calls.append(("put", x, y)), callback_missing_glyph = lambda: calls.append(("missing", )), callback_start_draw = lambda x, y: calls.append(("start", x, y)), callback_end_draw = lambda x, y: calls.append(("end", x, y)))
+			return calls
+		self._compare("write", lambda: record_write(font), lambda: record_write(ref_font), repr(text))
+
+		(width, height) = (self._rng.randint(1, 200), self._rng.randint(1, 24))
+		(posx, posy) = (self._rng.randint(-10, 20), self._rng.randint(-4, 20))
+		def render_canvas():
+			canvas = Canvas(width, height)
+			font.render(text, canvas, posx, posy)
+			return bytes(canvas.data)
+		self._compare("render", render_canvas, lambda: ref_font.render(text, width, height, posx, posy), "%s on %d x %d at %d, %d" % (repr(text), width, height, posx, posy))
+
+	def _check_label(self, font, ref_font):
+		# Incremental updates must leave the same canvas as a full render
+		(width, height) = (self._rng.randint(1, 200), self._rng.randint(1, 24))
+		(posx, posy) = (self._rng.randint(-10, 20), self._rng.randint(-4, 20))
+		label = TextLabel(font, Canvas(width, height), posx, posy)
+		for _ in range(3):
+			text = self._random_text(font)
+			self._compare("label-update", lambda: (label.update(text), bytes(label.canvas.data))[1], lambda: ref_font.render(text, width, height, posx, posy), "%s on %d x %d at %d, %d" % (repr(text), width, height, posx, posy))
+
+	def _check_convert(self, font, ref_font):
+		(fd, filename) = tempfile.mkstemp(prefix = "pftk_selfcheck_")
+		os.close(fd)
+		try:
+			for output_format in self._CONVERT_FORMATS:
+				for no_optimize in [ False, True ]:
+					def fast_convert():
+						args = argparse.Namespace(format = output_format, no_optimize = no_optimize, rotate = 0, outfile = filename, verbose = 0)
+						ActionConvert("convert", args, run = False).process(font)
+						with open(filename) as f:
+							return f.read()
+					def reference_convert():
+						f = io.StringIO()
+						ReferenceConverter(ref_font, no_optimize = no_optimize).convert(output_format, f)
+						return f.getvalue()
+					self._compare("convert-%s" % (output_format), fast_convert, reference_convert, "no_optimize = %s" % (no_optimize))
+		finally:
+			os.unlink(filename)
+
+	def check_font(self, font):
+		ref_font = ReferenceFont(font)
+		for (codepoint, glyph) in font:
+			self._check_glyph(glyph, ref_font.get_glyph(codepoint))
+		for _ in range(4):
+			self._check_text(font, ref_font)
+		self._check_label(font, ref_font)
+		self._check_convert(font, ref_font)
+		self._font_index += 1
+
+	def run(self, iterations):
+		for _ in range(iterations):
+			self.check_font(self.random_font())
+		return len(self._mismatches) == 0
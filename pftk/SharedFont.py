@@ -0,0 +1,184 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import json
+import mmap
+import struct
+from multiprocessing import shared_memory, resource_tracker
+from .Font import Font
+from .Glyph import Glyph
+
+class SharedFont(object):
+	# Segment layout: magic, length of the JSON glyph table, the table itself
+	# and then the concatenated raw data of all glyphs. Attached fonts consist
+	# of Glyphs whose raw data are read-only views into the segment.
+	_MAGIC = b"PFTKSHM2"
+	_HEADER = struct.Struct("<8sL")
+
+	def __init__(self, buffer, close_callbacks, shm = None, owner = False):
+		self._buffer = buffer
+		self._close_callbacks = close_callbacks
+		self._shm = shm
+		self._owner = owner
+		self._views = [ ]
+		self._font = None
+
+	@classmethod
+	def _serialize(cls, font):
+		glyph_table = [ ]
+		offset = 0
+		for (codepoint, glyph) in font:
+			glyph_table.append([ codepoint, glyph.width, glyph.height, glyph.xoffset, glyph.yoffset, glyph.xadvance, glyph.precise_xadvance, offset ])
+			offset += len(glyph.raw_data)
+		table = json.dumps({
+			"metadata": {
+				"name":			font.name,
+				"size":			font.size,
+				"antialiasing":	font.antialiasing,
+			},
+			"glyphs": glyph_table,
+			"kerning": font.kerning_pairs,
+		}).encode()
+		header = cls._HEADER.pack(cls._MAGIC, len(table))
+		return (header + table, offset)
+
+	@classmethod
+	def _write_segment(cls, buffer, font, prefix):
+		buffer[:len(prefix)] = prefix
+		offset = len(prefix)
+		for (codepoint, glyph) in font:
+			length = len(glyph.raw_data)
+			buffer[offset : offset + length] = glyph.raw_data
+			offset += length
+
+	@classmethod
+	def publish(cls, font, name = None):
+		(prefix, data_length) = cls._serialize(font)
+		shm = shared_memory.SharedMemory(name = name, create = True, size = max(len(prefix) + data_length, 1))
+		cls._write_segment(shm.buf, font, prefix)
+		return cls(shm.buf.toreadonly(), [ shm.close ], shm = shm, owner = True)
+
+	@classmethod
+	def attach(cls, name):
+		if sys.version_info >= (3, 13):
+			shm = shared_memory.SharedMemory(name = name, track = False)
+		else:
+			shm = shared_memory.SharedMemory(name = name)
+			# Attaching must not hand ownership to this process' resource
+			# tracker, otherwise the segment is unlinked when it exits.
+			if os.name == "posix":
+				resource_tracker.unregister(cls._tracker_name(shm), "shared_memory")
+		return cls(shm.buf.toreadonly(), [ shm.close ], shm = shm, owner = False)
+
+	@staticmethod
+	def _tracker_name(shm):
+		# The resource tracker knows POSIX segments by their full name, which
+		# is the public name with a leading slash
+		return "/" + shm.name
+
+	@classmethod
+	def publish_file(cls, font, filename):
+		(prefix, data_length) = cls._serialize(font)
+		with open(filename, "wb") as f:
+			f.truncate(max(len(prefix) + data_length, 1))
+		with open(filename, "r+b") as f, mmap.mmap(f.fileno(), 0) as mapping:
+			cls._write_segment(mapping, font, prefix)
+		return cls.attach_file(filename)
+
+	@classmethod
+	def attach_file(cls, filename):
+		with open(filename, "rb") as f:
+			mapping = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+		return cls(memoryview(mapping), [ mapping.close ])
+
+	@property
+	def name(self):
+		return self._shm.name if (self._shm is not None) else None
+
+	@property
+	def owner(self):
+		return self._owner
+
+	@property
+	def font(self):
+		if self._font is None:
+			self._font = self._load_font()
+		return self._font
+
+	def _load_font(self):
+		(magic, table_length) = self._HEADER.unpack(self._buffer[:self._HEADER.size])
+		if magic != self._MAGIC:
+			raise Exception("Not a shared pftk font segment.")
+		data_offset = self._HEADER.size + table_length
+		table = json.loads(bytes(self._buffer[self._HEADER.size : data_offset]))
+		meta = table["metadata"]
+		font = Font(name = meta["name"], size = meta["size"], antialiasing = meta["antialiasing"])
+		for (codepoint, width, height, xoffset, yoffset, xadvance, precise_xadvance, offset) in table["glyphs"]:
+			view = self._buffer[data_offset + offset : data_offset + offset + (width * height)]
+			self._views.append(view)
+			font.add_glyph(Glyph(codepoint = codepoint, width = width, height = height, xoffset = xoffset, yoffset = yoffset, xadvance = xadvance, raw_data = view, precise_xadvance = precise_xadvance))
+		for (left, right, value) in table.get("kerning", [ ]):
+			font.set_kerning(left, right, value)
+		return font
+
+	def close(self):
+		# Glyphs obtained from this font become unusable after closing. Views
+		# the caller derived from glyph data keep the mapping alive; closing
+		# then returns False and can be retried once they are released.
+		self._font = None
+		views = [ ]
+		for view in self._views:
+			try:
+				view.release()
+			except BufferError:
+				views.append(view)
+		self._views = views
+		if len(self._views) > 0:
+			return False
+		if self._buffer is not None:
+			self._buffer.release()
+			self._buffer = None
+		while len(self._close_callbacks) > 0:
+			try:
+				self._close_callbacks[0]()
+			except BufferError:
+				return False
+			self._close_callbacks.pop(0)
+		return True
+
+	def unlink(self):
+		if not self._owner:
+			raise Exception("Only the process that published a shared font may unlink it.")
+		if (sys.version_info < (3, 13)) and (os.name == "posix"):
+			# A child process attaching through a shared resource tracker has
+			# unregistered the segment already; unlink() unregisters again.
+			resource_tracker.register(self._tracker_name(self._shm), "shared_memory")
+		self._shm.unlink()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+		if self._owner:
+			self.unlink()
@@ -0,0 +1,145 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import operator
+import multiprocessing
+from .Glyph import Glyph
+
+class InkProfile(object):
+	# Leftmost and rightmost ink column (relative to the pen position) for
+	# every row of a vertical range relative to the baseline. Rows without
+	# ink hold a sentinel that is far outside of any real glyph, so that
+	# comparing two profiles element-wise never picks such a row as minimum.
+	EMPTY = 1 << 24
+
+	def __init__(self, glyph, top = None, height = None):
+		if top is None:
+			(top, height) = (glyph.yoffset, glyph.height)
+		self._glyph = glyph
+		self._top = top
+		left = [ self.EMPTY ] * height
+		right = [ -self.EMPTY ] * height
+		for (y, row) in enumerate(glyph.get_rows()):
+			if row != 0:
+				index = glyph.yoffset + y - top
+				left[index] = glyph.xoffset + (row & -row).bit_length() - 1
+				right[index] = glyph.xoffset + row.bit_length() - 1
+		self._left = tuple(left)
+		self._right = tuple(right)
+
+	@property
+	def glyph(self):
+		return self._glyph
+
+	@property
+	def left(self):
+		return self._left
+
+	@property
+	def right(self):
+		return self._right
+
+	@property
+	def empty(self):
+		return min(self._left, default = self.EMPTY) == self.EMPTY
+
+	@property
+	def ink_left(self):
+		return min(self._left)
+
+	@property
+	def ink_right(self):
+		return max(self._right)
+
+	def dilated_right(self):
+		# Rightmost ink of each row and its vertical neighbors, so that
+		# diagonally adjacent pixels of two glyphs count as touching
+		above = (-self.EMPTY, ) + self._right[:-1]
+		below = self._right[1:] + (-self.EMPTY, )
+		return tuple(map(max, above, self._right, below))
+
+	def respace(self, spacing):
+		# Moves the ink so that the left side bearing is half of the spacing
+		# and sets the advance to the ink width plus spacing. A fractional
+		# advance changes by the same amount.
+		if self.empty:
+			return self._glyph
+		left_bearing = spacing // 2
+		xoffset = self._glyph.xoffset - self.ink_left + left_bearing
+		xadvance = self.ink_right - self.ink_left + 1 + spacing
+		return Glyph(codepoint = self._glyph.codepoint, width = self._glyph.width, height = self._glyph.height, xoffset = xoffset, yoffset = self._glyph.yoffset, xadvance = xadvance, raw_data = self._glyph.raw_data, precise_xadvance = self._glyph.precise_xadvance + xadvance - self._glyph.xadvance)
+
+_kerning_profiles = None
+
+def _init_kerning_worker(profiles):
+	global _kerning_profiles
+	_kerning_profiles = profiles
+
+def _kerning_chunk(job):
+	(left_codepoints, gap) = job
+	pairs = [ ]
+	for left_codepoint in left_codepoints:
+		(xadvance, right_profile, left_profile) = _kerning_profiles[left_codepoint]
+		for (right_codepoint, (right_xadvance, right_right_profile, right_left_profile)) in _kerning_profiles.items():
+			closest = min(map(operator.sub, right_left_profile, right_profile))
+			if closest >= InkProfile.EMPTY // 2:
+				# No row in which both glyphs have ink
+				continue
+			kerning = gap - (xadvance + closest - 1)
+			# Never tighten by more than half of the narrower glyph
+			kerning = max(kerning, -(min(xadvance, right_xadvance) // 2))
+			if kerning != 0:
+				pairs.append((left_codepoint, right_codepoint, kerning))
+	return pairs
+
+class AutoKerning(object):
+	# Computes a kerning value for every ordered pair of glyphs so that the
+	# closest ink of both glyphs is exactly gap pixels apart. Each pair is a
+	# single element-wise profile comparison; the left glyphs are split into
+	# chunks which are processed in parallel.
+	def __init__(self, glyphs, gap = 1, chunksize = 16):
+		glyphs = list(glyphs)
+		self._gap = gap
+		self._chunksize = chunksize
+		top = min((glyph.yoffset for glyph in glyphs), default = 0)
+		bottom = max((glyph.yoffset + glyph.height for glyph in glyphs), default = 0)
+		self._profiles = { }
+		for glyph in glyphs:
+			profile = InkProfile(glyph, top = top, height = bottom - top)
+			if not profile.empty:
+				self._profiles[glyph.codepoint] = (glyph.xadvance, profile.dilated_right(), profile.left)
+
+	def _jobs(self):
+		codepoints = sorted(self._profiles)
+		for i in range(0, len(codepoints), self._chunksize):
+			yield (codepoints[i : i + self._chunksize], self._gap)
+
+	def compute(self, processes = None):
+		jobs = list(self._jobs())
+		if processes is None:
+			processes = multiprocessing.cpu_count()
+		if (processes == 1) or (len(jobs) <= 1):
+			_init_kerning_worker(self._profiles)
+			chunks = list(map(_kerning_chunk, jobs))
+		else:
+			with multiprocessing.Pool(processes = processes, initializer = _init_kerning_worker, initargs = (self._profiles, )) as pool:
+				chunks = list(pool.imap_unordered(_kerning_chunk, jobs))
+		return sorted(pair for chunk in chunks for pair in chunk)
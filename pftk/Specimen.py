@@ -0,0 +1,158 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import io
+import math
+import collections
+import multiprocessing
+import PIL.Image, PIL.ImageDraw, PIL.ImageFont
+from .Glyph import Glyph
+from .Canvas import Canvas
+
+# All sizes are in font pixels, i.e., before scaling, except for the header
+# height which is in output pixels
+SpecimenGeometry = collections.namedtuple("SpecimenGeometry", [ "columns", "scale", "cell_width", "cell_height", "header_height", "origin_x", "origin_y", "top", "bottom", "guides" ])
+
+_GRID_COLOR = (210, 210, 210)
+_LABEL_COLOR = (90, 90, 90)
+_BASELINE_COLOR = (0, 0, 255, 100)
+_ORIGIN_COLOR = (255, 0, 0, 100)
+_ADVANCE_COLOR = (0, 255, 0, 100)
+
+_label_font = None
+_label_chars = { }
+
+def _get_label_font():
+	global _label_font
+	if _label_font is None:
+		_label_font = PIL.ImageFont.load_default()
+	return _label_font
+
+def _draw_label(img, x, y, text):
+	# Labels only use a handful of distinct characters, which are rendered
+	# once and then pasted as masks
+	label_font = _get_label_font()
+	for char in text:
+		if char not in _label_chars:
+			(_, _, right, bottom) = label_font.getbbox(char)
+			mask = PIL.Image.new("L", (max(right, 1), max(bottom, 1)))
+			PIL.ImageDraw.Draw(mask).text((0, 0), char, font = label_font, fill = 255)
+			_label_chars[char] = (mask, label_font.getlength(char))
+		(mask, advance) = _label_chars[char]
+		img.paste(_LABEL_COLOR, (round(x), y), mask)
+		x += advance
+
+def _render_serialized_page(job):
+	# Worker processes only receive the glyphs of the page they render
+	(page_number, page_count, font_name, glyph_data, geometry) = job
+	return _render_page((page_number, page_count, font_name, [ Glyph.deserialize(data) for data in glyph_data ], geometry))
+
+def _render_page(job):
+	(page_number, page_count, font_name, glyphs, geometry) = job
+	(cell_width, cell_height) = (geometry.cell_width, geometry.cell_height)
+	columns = min(len(glyphs), geometry.columns)
+	rows = (len(glyphs) + geometry.columns - 1) // geometry.columns
+	canvas = Canvas(columns * cell_width, rows * cell_height)
+	for (index, glyph) in enumerate(glyphs):
+		(column, row) = (index % geometry.columns, index // geometry.columns)
+		canvas.blit(glyph, (column * cell_width) + geometry.origin_x, (row * cell_height) + geometry.origin_y)
+
+	# Glyphs are scaled up as a whole, labels, guides and the grid are drawn
+	# at output resolution afterwards
+	scale = geometry.scale
+	glyph_img = canvas.to_grayscale_image().resize((canvas.width * scale, canvas.height * scale), PIL.Image.NEAREST)
+	img = PIL.Image.new("RGB", (glyph_img.width + 1, glyph_img.height + geometry.header_height + 1), (255, 255, 255))
+	img.paste(glyph_img, (0, geometry.header_height))
+	draw = PIL.ImageDraw.Draw(img, "RGBA")
+	header = "%s, page %d of %d" % (font_name or "unnamed font", page_number, page_count)
+	_draw_label(img, 2, 1, header)
+	for (index, glyph) in enumerate(glyphs):
+		(column, row) = (index % geometry.columns, index // geometry.columns)
+		x0 = column * cell_width * scale
+		y0 = geometry.header_height + (row * cell_height * scale)
+		draw.rectangle((x0, y0, x0 + (cell_width * scale), y0 + (cell_height * scale)), outline = _GRID_COLOR)
+		_draw_label(img, x0 + 2, y0 + 1, "U+%04X" % (ord(glyph.codepoint)))
+		if geometry.guides:
+			origin_x = x0 + (geometry.origin_x * scale)
+			baseline_y = y0 + (geometry.origin_y * scale)
+			(top_y, bottom_y) = (baseline_y + (geometry.top * scale), baseline_y + (geometry.bottom * scale) - 1)
+			draw.line((x0 + 1, baseline_y, x0 + (cell_width * scale) - 1, baseline_y), fill = _BASELINE_COLOR)
+			draw.line((origin_x, top_y, origin_x, bottom_y), fill = _ORIGIN_COLOR)
+			draw.line((origin_x + (glyph.xadvance * scale), top_y, origin_x + (glyph.xadvance * scale), bottom_y), fill = _ADVANCE_COLOR)
+
+	output = io.BytesIO()
+	img.save(output, format = "png", compress_level = 3)
+	return (page_number, output.getvalue())
+
+class Specimen(object):
+	# Lays out glyphs in a fixed grid which is split into pages. Each cell
+	# is large enough for every selected glyph including its advance, so
+	# that the baselines of all cells in a row line up. Pages are rendered
+	# and encoded in parallel; only their PNG data is passed back.
+	def __init__(self, font, codepoints = None, columns = 16, rows = 16, scale = 2, guides = True, padding = 1):
+		self._font = font
+		self._codepoints = sorted(codepoints) if (codepoints is not None) else font.codepoints
+		self._columns = columns
+		self._rows = rows
+		self._geometry = self._compute_geometry(scale, guides, padding)
+
+	def _compute_geometry(self, scale, guides, padding):
+		(left, right, top, bottom) = (0, 0, 0, 0)
+		for codepoint in self._codepoints:
+			glyph = self._font.get_glyph(codepoint)
+			left = min(left, glyph.xoffset)
+			right = max(right, glyph.xoffset + glyph.width, glyph.xadvance)
+			top = min(top, glyph.yoffset)
+			bottom = max(bottom, glyph.yoffset + glyph.height)
+
+		label_font = _get_label_font()
+		(_, _, label_width, label_bottom) = label_font.getbbox("U+10FFFF")
+		label_height = label_bottom + 2
+		label_rows = math.ceil(label_height / scale)
+		cell_width = max((right - left) + (2 * padding), math.ceil((label_width + 4) / scale))
+		cell_height = label_rows + (bottom - top) + (2 * padding)
+		return SpecimenGeometry(columns = self._columns, scale = scale, cell_width = cell_width, cell_height = cell_height, header_height = label_height + 2, origin_x = padding - left, origin_y = label_rows + padding - top, top = top, bottom = bottom, guides = guides)
+
+	@property
+	def glyphs_per_page(self):
+		return self._columns * self._rows
+
+	@property
+	def page_count(self):
+		return (len(self._codepoints) + self.glyphs_per_page - 1) // self.glyphs_per_page
+
+	def _jobs(self, serialized):
+		page_count = self.page_count
+		for (page_index, i) in enumerate(range(0, len(self._codepoints), self.glyphs_per_page)):
+			glyphs = [ self._font.get_glyph(codepoint) for codepoint in self._codepoints[i : i + self.glyphs_per_page] ]
+			if serialized:
+				glyphs = [ glyph.serialize() for glyph in glyphs ]
+			yield (page_index + 1, page_count, self._font.name, glyphs, self._geometry)
+
+	def render_pages(self, processes = None):
+		# Yields (page number, PNG data) in page order, one page at a time
+		if processes is None:
+			processes = multiprocessing.cpu_count()
+		if (processes == 1) or (self.page_count <= 1):
+			yield from map(_render_page, self._jobs(serialized = False))
+		else:
+			with multiprocessing.Pool(processes = processes) as pool:
+				yield from pool.imap(_render_serialized_page, self._jobs(serialized = True))
@@ -0,0 +1,135 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import operator
+import collections
+from .Glyph import Glyph
+
+class SubpixelRenderer(object):
+	# Renders text at fractional pen positions. The fraction is rounded to
+	# one of a number of phases; for each phase, a glyph is resampled once by
+	# shifting it right by that fraction of a pixel and the result is kept in
+	# an LRU cache.
+	_PlacedGlyph = collections.namedtuple("PlacedGlyph", [ "glyph", "x", "y", "end_x", "end_posx" ])
+	_phase_tables = { }
+
+	def __init__(self, renderer, phases = 4, cache_size = 1024):
+		assert(phases >= 1)
+		self._renderer = renderer
+		self._phases = phases
+		self._cache_size = cache_size
+		self._variants = collections.OrderedDict()
+
+	@property
+	def phases(self):
+		return self._phases
+
+	@classmethod
+	def _phase_table(cls, phase, phases):
+		# table[a][b] is the value of a pixel which had value a and whose left
+		# neighbor had value b, after shifting by phase / phases pixels
+		key = (phase, phases)
+		table = cls._phase_tables.get(key)
+		if table is None:
+			table = [ bytes(((a * (phases - phase)) + (b * phase) + (phases // 2)) // phases for b in range(256)) for a in range(256) ]
+			cls._phase_tables[key] = table
+		return table
+
+	def _shift_glyph(self, glyph, phase):
+		if (phase == 0) or (glyph.width == 0):
+			return glyph
+		table = self._phase_table(phase, self._phases)
+		raw_data = bytes(glyph.raw_data)
+		width = glyph.width
+		rows = [ ]
+		for y in range(glyph.height):
+			row = raw_data[y * width : (y + 1) * width]
+			# The shifted glyph is one pixel wider; background is 255
+			current = row + b"\xff"
+			left = b"\xff" + row
+			rows.append(bytes(map(operator.getitem, map(table.__getitem__, current), left)))
+		return Glyph(codepoint = glyph.codepoint, width = width + 1, height = glyph.height, xoffset = glyph.xoffset, yoffset = glyph.yoffset, xadvance = glyph.xadvance, raw_data = b"".join(rows), precise_xadvance = glyph.precise_xadvance)
+
+	def get_variant(self, codepoint, phase):
+		key = (codepoint, phase)
+		variant = self._variants.get(key)
+		if variant is not None:
+			self._variants.move_to_end(key)
+			return variant
+		glyph = self._renderer.get_glyph(codepoint)
+		if glyph is None:
+			return None
+		variant = self._shift_glyph(glyph, phase)
+		self._variants[key] = variant
+		if len(self._variants) > self._cache_size:
+			self._variants.popitem(last = False)
+		return variant
+
+	def _split_position(self, posx):
+		# Integer pixel and phase of a fractional position
+		pixel = math.floor(posx)
+		phase = round((posx - pixel) * self._phases)
+		if phase == self._phases:
+			(pixel, phase) = (pixel + 1, 0)
+		return (pixel, phase)
+
+	def get_text_width(self, text, letter_spacing = 0):
+		width = 0
+		previous = None
+		for char in text:
+			glyph = self._renderer.get_glyph(char)
+			if glyph is None:
+				previous = None
+			else:
+				if previous is not None:
+					width += self._renderer.get_kerning(previous, char)
+				previous = char
+				width += glyph.precise_xadvance + letter_spacing
+		return width
+
+	def place(self, text, posx, posy, letter_spacing = 0):
+		# posx, letter_spacing and the glyph advances may be fractional,
+		# posy is a whole pixel. Yields the phase variant of each glyph with
+		# the whole pixel it is drawn at and the pen position after its
+		# advance, both as whole pixel and as fractional position.
+		previous = None
+		for char in text:
+			glyph = self._renderer.get_glyph(char)
+			if glyph is None:
+				previous = None
+			else:
+				if previous is not None:
+					posx += self._renderer.get_kerning(previous, char)
+				previous = char
+				(pixel, phase) = self._split_position(posx)
+				end_posx = posx + glyph.precise_xadvance
+				yield self._PlacedGlyph(glyph = self.get_variant(char, phase), x = pixel, y = posy, end_x = self._split_position(end_posx)[0], end_posx = end_posx)
+				posx = end_posx + letter_spacing
+
+	def render(self, text, canvas, posx, posy, letter_spacing = 0):
+		for placed_glyph in self.place(text, posx, posy, letter_spacing = letter_spacing):
+			canvas.blit(placed_glyph.glyph, placed_glyph.x, placed_glyph.y)
+			posx = placed_glyph.end_posx + letter_spacing
+		return posx
+
+	def invalidate(self):
+		self._variants = collections.OrderedDict()
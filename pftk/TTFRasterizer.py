@@ -0,0 +1,104 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import multiprocessing
+import PIL.Image, PIL.ImageDraw, PIL.ImageFont
+from .Font import Font
+from .Glyph import Glyph
+
+_ttf_cache = { }
+_invert_table = bytes(range(255, -1, -1))
+
+def _get_ttf(ttf_filename, size):
+	key = (ttf_filename, size)
+	ttf = _ttf_cache.get(key)
+	if ttf is None:
+		ttf = PIL.ImageFont.truetype(ttf_filename, size)
+		_ttf_cache[key] = ttf
+	return ttf
+
+def _rasterize_chunk(job):
+	(ttf_filename, size, antialiasing, chars) = job
+	ttf = _get_ttf(ttf_filename, size)
+	# Advances are whole pixels at the nominal size; measuring at 64 times
+	# the size yields them in 1/64 pixels for sub-pixel positioning of
+	# anti-aliased glyphs
+	precise_ttf = _get_ttf(ttf_filename, size * 64) if antialiasing else None
+
+	glyphs = [ ]
+	fontmode = "L" if antialiasing else "1"
+	for char in chars:
+		# Glyphs are cropped to their ink, like those of imported images
+		(mask, (mask_left, mask_top)) = ttf.getmask2(char, mode = fontmode, anchor = "ls")
+		ink_box = mask.getbbox()
+		if ink_box is None:
+			(width, height, left, top) = (0, 0, 0, 0)
+			raw_data = bytes()
+		else:
+			(left, top) = (mask_left + ink_box[0], mask_top + ink_box[1])
+			(width, height) = (ink_box[2] - ink_box[0], ink_box[3] - ink_box[1])
+			img = PIL.Image.new("L", (width, height))
+			draw = PIL.ImageDraw.Draw(img)
+			draw.fontmode = fontmode
+			draw.text((-left, -top), char, font = ttf, fill = 255, anchor = "ls")
+			raw_data = img.tobytes().translate(_invert_table)
+		xadvance = round(ttf.getlength(char))
+		precise_xadvance = round(precise_ttf.getlength(char)) / 64 if antialiasing else None
+		if precise_xadvance == xadvance:
+			precise_xadvance = None
+		glyph = Glyph(codepoint = char, width = width, height = height, xoffset = left, yoffset = top, xadvance = xadvance, raw_data = raw_data, precise_xadvance = precise_xadvance)
+		glyphs.append(glyph.serialize())
+	return (size, glyphs)
+
+class TTFRasterizer(object):
+	def __init__(self, ttf_filename, antialiasing = False, chunksize = 64):
+		self._ttf_filename = ttf_filename
+		self._antialiasing = antialiasing
+		self._chunksize = chunksize
+
+	@property
+	def name(self):
+		ttf = PIL.ImageFont.truetype(self._ttf_filename, 10)
+		return " ".join(part for part in ttf.getname() if part is not None)
+
+	def _jobs(self, chars, sizes):
+		for size in sizes:
+			for i in range(0, len(chars), self._chunksize):
+				yield (self._ttf_filename, size, self._antialiasing, chars[i : i + self._chunksize])
+
+	def rasterize(self, chars, sizes, processes = None):
+		chars = sorted(set(chars))
+		name = self.name
+		fonts = { size: Font(name = name, size = size, antialiasing = self._antialiasing) for size in sizes }
+		jobs = list(self._jobs(chars, sizes))
+		if processes == 1:
+			results = map(_rasterize_chunk, jobs)
+			self._collect(fonts, results)
+		else:
+			with multiprocessing.Pool(processes = processes) as pool:
+				self._collect(fonts, pool.imap_unordered(_rasterize_chunk, jobs))
+		return fonts
+
+	@staticmethod
+	def _collect(fonts, results):
+		for (size, glyphs) in results:
+			for glyph_data in glyphs:
+				fonts[size].add_glyph(Glyph.deserialize(glyph_data))
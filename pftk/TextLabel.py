@@ -0,0 +1,103 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import collections
+from .TextLayout import TextLayout, TextAlignment
+
+class TextLabel(object):
+	# Text that stays on a canvas and is changed in place, e.g., a clock or a
+	# counter. An update only redraws glyphs whose character or position
+	# changed and reports the canvas areas that were touched, so that only
+	# those have to be sent to the display.
+	_Rectangle = collections.namedtuple("Rectangle", [ "x", "y", "width", "height" ])
+
+	def __init__(self, renderer, canvas, posx, posy, max_width = None, alignment = TextAlignment.Left, text_layout = None, background = 255):
+		self._canvas = canvas
+		self._posx = posx
+		self._posy = posy
+		self._max_width = max_width
+		self._alignment = alignment
+		self._text_layout = text_layout if (text_layout is not None) else TextLayout(renderer)
+		self._background = background
+		self._text = None
+		self._placed = frozenset()
+
+	@property
+	def text(self):
+		return self._text
+
+	@property
+	def canvas(self):
+		return self._canvas
+
+	def _glyph_box(self, placed_glyph):
+		glyph = placed_glyph.glyph
+		x = self._posx + placed_glyph.x + glyph.xoffset
+		y = self._posy + placed_glyph.y + glyph.yoffset
+		(x0, y0) = (max(x, 0), max(y, 0))
+		(x1, y1) = (min(x + glyph.width, self._canvas.width), min(y + glyph.height, self._canvas.height))
+		if (x1 <= x0) or (y1 <= y0):
+			return None
+		return self._Rectangle(x = x0, y = y0, width = x1 - x0, height = y1 - y0)
+
+	@staticmethod
+	def _intersects(a, b):
+		return (a.x < b.x + b.width) and (b.x < a.x + a.width) and (a.y < b.y + b.height) and (b.y < a.y + a.height)
+
+	@classmethod
+	def _merge(cls, rectangles):
+		# Overlapping rectangles are joined into their bounding box until no
+		# two of them overlap
+		merged = [ ]
+		for rectangle in sorted(rectangles):
+			index = 0
+			while index < len(merged):
+				other = merged[index]
+				if cls._intersects(rectangle, other):
+					(x0, y0) = (min(rectangle.x, other.x), min(rectangle.y, other.y))
+					(x1, y1) = (max(rectangle.x + rectangle.width, other.x + other.width), max(rectangle.y + rectangle.height, other.y + other.height))
+					rectangle = cls._Rectangle(x = x0, y = y0, width = x1 - x0, height = y1 - y0)
+					del merged[index]
+					index = 0
+				else:
+					index += 1
+			merged.append(rectangle)
+		return sorted(merged)
+
+	def update(self, text):
+		if text == self._text:
+			return [ ]
+		layout = self._text_layout.layout(text, max_width = self._max_width, alignment = self._alignment)
+		placed = frozenset(layout.glyphs)
+		changed = (self._placed - placed) | (placed - self._placed)
+		dirty = self._merge(box for box in map(self._glyph_box, changed) if box is not None)
+
+		# Clearing a dirty area also removes ink of unchanged neighbors that
+		# reach into it, so every glyph overlapping it is drawn again
+		boxes = [ (placed_glyph, self._glyph_box(placed_glyph)) for placed_glyph in placed ]
+		for rectangle in dirty:
+			self._canvas.fill(rectangle.x, rectangle.y, rectangle.width, rectangle.height, value = self._background)
+			for (placed_glyph, box) in boxes:
+				if (box is not None) and self._intersects(box, rectangle):
+					self._canvas.blit(placed_glyph.glyph, self._posx + placed_glyph.x, self._posy + placed_glyph.y, clip = rectangle)
+		self._text = text
+		self._placed = placed
+		return dirty
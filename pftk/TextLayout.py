@@ -0,0 +1,192 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import enum
+import collections
+from .RotatedFont import RotatedFont
+
+class TextAlignment(enum.Enum):
+	Left = "left"
+	Center = "center"
+	Right = "right"
+
+class TextLayout(object):
+	# Multi-line layout on top of a font or font stack: applies kerning,
+	# breaks lines at newlines and, given a maximum width, at spaces. Results
+	# are kept in an LRU cache so that laying out the same label again is a
+	# dictionary lookup. All coordinates are relative to the pen position at
+	# the start of the first baseline.
+	_GlyphMetrics = collections.namedtuple("GlyphMetrics", [ "glyph", "xadvance", "height_above_baseline", "height_below_baseline" ])
+	_PlacedGlyph = collections.namedtuple("PlacedGlyph", [ "codepoint", "glyph", "x", "y" ])
+	_Line = collections.namedtuple("Line", [ "text", "x", "y", "width" ])
+	_Layout = collections.namedtuple("Layout", [ "width", "height", "height_above_baseline", "height_below_baseline", "lines", "glyphs" ])
+
+	def __init__(self, renderer, line_height = None, cache_size = 256):
+		self._renderer = renderer
+		self._cache_size = cache_size
+		self._cache = collections.OrderedDict()
+		self._metrics = { }
+		self._fixed_line_height = line_height
+		self._line_height = line_height
+
+	@property
+	def line_height(self):
+		# Only determined when needed, since it requires all glyphs
+		if self._line_height is None:
+			self._line_height = self._default_line_height()
+		return self._line_height
+
+	def _default_line_height(self):
+		# Tallest ink extent of the font plus one pixel of spacing
+		(above, below) = (0, 0)
+		for glyph in self._renderer.get_all_glyphs():
+			metrics = self._get_metrics(glyph.codepoint)
+			above = max(above, metrics.height_above_baseline)
+			below = max(below, metrics.height_below_baseline)
+		return above + below + 2
+
+	def _get_metrics(self, char):
+		if char not in self._metrics:
+			glyph = self._renderer.get_glyph(char)
+			if glyph is None:
+				self._metrics[char] = None
+			else:
+				extents = glyph.find_extents()
+				if extents.miny is None:
+					(above, below) = (0, 0)
+				else:
+					above = max(0, -(glyph.yoffset + extents.miny))
+					below = max(0, glyph.yoffset + extents.maxy)
+				self._metrics[char] = self._GlyphMetrics(glyph = glyph, xadvance = glyph.xadvance, height_above_baseline = above, height_below_baseline = below)
+		return self._metrics[char]
+
+	def _break_paragraph(self, paragraph, max_width):
+		lines = [ ]
+		line_start = 0
+		break_at = None
+		pen = 0
+		previous = None
+		index = 0
+		while index < len(paragraph):
+			char = paragraph[index]
+			metrics = self._get_metrics(char)
+			advance = 0
+			if metrics is not None:
+				advance = metrics.xadvance
+				if previous is not None:
+					advance += self._renderer.get_kerning(previous, char)
+
+			if (max_width is not None) and (char != " ") and (index > line_start) and (pen + advance > max_width):
+				if break_at is not None:
+					lines.append(paragraph[line_start : break_at])
+					index = break_at
+				else:
+					# Single word wider than the line, break within it
+					lines.append(paragraph[line_start : index])
+				while (index < len(paragraph)) and (paragraph[index] == " "):
+					index += 1
+				(line_start, break_at, pen, previous) = (index, None, 0, None)
+				continue
+
+			if (char == " ") and (index > line_start) and (paragraph[index - 1] != " "):
+				break_at = index
+			pen += advance
+			previous = char if (metrics is not None) else None
+			index += 1
+		lines.append(paragraph[line_start:])
+		return lines
+
+	def _place_line(self, text, y):
+		placed = [ ]
+		(pen, above, below) = (0, 0, 0)
+		previous = None
+		for char in text:
+			metrics = self._get_metrics(char)
+			if metrics is None:
+				previous = None
+				continue
+			if previous is not None:
+				pen += self._renderer.get_kerning(previous, char)
+			placed.append(self._PlacedGlyph(codepoint = char, glyph = metrics.glyph, x = pen, y = y))
+			pen += metrics.xadvance
+			above = max(above, metrics.height_above_baseline)
+			below = max(below, metrics.height_below_baseline)
+			previous = char
+		return (placed, pen, above, below)
+
+	def _layout(self, text, max_width, alignment):
+		placed_lines = [ ]
+		for paragraph in text.split("\n"):
+			for line_text in self._break_paragraph(paragraph, max_width):
+				y = (len(placed_lines) * self.line_height) if (len(placed_lines) > 0) else 0
+				placed_lines.append((line_text, y) + self._place_line(line_text, y))
+
+		box_width = max_width if (max_width is not None) else max(width for (line_text, y, placed, width, above, below) in placed_lines)
+		lines = [ ]
+		glyphs = [ ]
+		for (line_text, y, placed, width, above, below) in placed_lines:
+			if alignment == TextAlignment.Left:
+				x = 0
+			elif alignment == TextAlignment.Center:
+				x = (box_width - width) // 2
+			elif alignment == TextAlignment.Right:
+				x = box_width - width
+			else:
+				raise NotImplementedError(alignment)
+			lines.append(self._Line(text = line_text, x = x, y = y, width = width))
+			glyphs += [ placed_glyph._replace(x = placed_glyph.x + x) for placed_glyph in placed ]
+
+		height_above_baseline = placed_lines[0][4]
+		height_below_baseline = placed_lines[-1][1] + placed_lines[-1][5]
+		return self._Layout(width = box_width, height = height_above_baseline + height_below_baseline, height_above_baseline = height_above_baseline, height_below_baseline = height_below_baseline, lines = tuple(lines), glyphs = tuple(glyphs))
+
+	def layout(self, text, max_width = None, alignment = TextAlignment.Left):
+		key = (text, max_width, alignment)
+		result = self._cache.get(key)
+		if result is not None:
+			self._cache.move_to_end(key)
+			return result
+		result = self._layout(text, max_width, alignment)
+		self._cache[key] = result
+		if len(self._cache) > self._cache_size:
+			self._cache.popitem(last = False)
+		return result
+
+	def render(self, text, canvas, posx, posy, max_width = None, alignment = TextAlignment.Left, rotation = 0):
+		# With a rotation, the canvas is the rotated one while posx and posy
+		# still refer to the upright text
+		result = self.layout(text, max_width = max_width, alignment = alignment)
+		if rotation == 0:
+			for placed_glyph in result.glyphs:
+				canvas.blit(placed_glyph.glyph, posx + placed_glyph.x, posy + placed_glyph.y)
+		else:
+			rotated = self._renderer.rotated(rotation)
+			(width, height) = RotatedFont.rotated_size(canvas.width, canvas.height, rotation)
+			for placed_glyph in result.glyphs:
+				(x, y) = RotatedFont.transform_point(posx + placed_glyph.x, posy + placed_glyph.y, width, height, rotation)
+				canvas.blit(rotated.get_glyph(placed_glyph.codepoint), x, y)
+		return result
+
+	def invalidate(self):
+		# Must be called when glyphs or kerning of the underlying font change
+		self._cache = collections.OrderedDict()
+		self._metrics = { }
+		self._line_height = self._fixed_line_height
@@ -0,0 +1,96 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import collections
+
+class TextRenderer(object):
+	# Text measuring and drawing on top of get_glyph(); shared by fonts and
+	# font stacks.
+	_TextExtents = collections.namedtuple("TextExtents", [ "width", "height", "height_above_baseline", "height_below_baseline", "missing_glyphs", "missing_glyph_count" ])
+
+	def get_glyph(self, codepoint):
+		raise NotImplementedError(self.__class__.__name__)
+
+	def get_kerning(self, left, right):
+		# Adjustment of the pen position between two adjacent glyphs
+		return 0
+
+	def get_text_extents(self, text):
+		missing_glyphs = set()
+		missing_glyph_count = 0
+		posx = 0
+		max_y_above = 0
+		max_y_below = 0
+		previous = None
+		for char in text:
+			glyph = self.get_glyph(char)
+			if glyph is None:
+				missing_glyph_count += 1
+				missing_glyphs.add(char)
+				previous = None
+			else:
+				if previous is not None:
+					posx += self.get_kerning(previous, char)
+				previous = char
+				for (x, y) in glyph.iter_set_pixels(mode = "virtual"):
+					if y <= 0:
+						# Above baseline
+						max_y_above = max(max_y_above, abs(y))
+					else:
+						# Below baseline
+						max_y_below = max(max_y_below, y)
+				posx += glyph.xadvance
+		return self._TextExtents(width = posx, height = max_y_above + max_y_below, height_above_baseline = max_y_above, height_below_baseline = max_y_below, missing_glyphs = missing_glyphs, missing_glyph_count = missing_glyph_count)
+
+	def write(self, text, posx, posy, callback_put_pixel = None, callback_missing_glyph = None, callback_start_draw = None, callback_end_draw = None):
+		previous = None
+		for char in text:
+			glyph = self.get_glyph(char)
+			if glyph is None:
+				if callback_missing_glyph is not None:
+					callback_missing_glyph()
+				previous = None
+			else:
+				if previous is not None:
+					posx += self.get_kerning(previous, char)
+				previous = char
+				if callback_start_draw is not None:
+					callback_start_draw(posx, posy)
+				for (x, y) in glyph.iter_set_pixels(mode = "virtual", ref = (posx, posy)):
+					if callback_put_pixel is not None:
+						callback_put_pixel(x, y)
+				posx += glyph.xadvance
+				if callback_end_draw is not None:
+					callback_end_draw(posx, posy)
+
+	def render(self, text, canvas, posx, posy):
+		previous = None
+		for char in text:
+			glyph = self.get_glyph(char)
+			if glyph is None:
+				previous = None
+			else:
+				if previous is not None:
+					posx += self.get_kerning(previous, char)
+				previous = char
+				canvas.blit(glyph, posx, posy)
+				posx += glyph.xadvance
+		return posx
@@ -20,48 +20,6 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import sys
-from .MultiCommand import MultiCommand
-from .ActionImportImage import ActionImportImage
-from .ActionConvert import ActionConvert
-from .ActionDraw import ActionDraw
-from .ActionManipulate import ActionManipulate
-from .ActionDebug import ActionDebug
+from .Commands import create_multicommand
 
-mc = MultiCommand()
-
-def genparser(parser):
-	parser.add_argument("-g", "--glyphs", metavar = "glyphstr", required = True, help = "Specifies the characters that correspond to the imported glyphs. Mandatory argument.")
-	parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
-	parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
-	parser.add_argument("png_image", help = "PNG image to import")
-mc.register("import", "Import a pixel image into the PFG native format", genparser, action = ActionImportImage)
-
-def genparser(parser):
-	parser.add_argument("--no-optimize", action = "store_true", help = "By default, glyphs are optimized before conversion for some output formats. This option turns this auto-optimization off.")
-	parser.add_argument("-f", "--format", choices = [ "ascii", "bitfontmaker", "python" ], default = "ascii", help = "Specifies the output format to write. Can be one of %(choices)s, defaults to %(default)s.")
-	parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
-	parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
-	parser.add_argument("font_filename", help = "Font filename to read")
-mc.register("convert", "Convert a pftk native font into something else", genparser, action = ActionConvert)
-
-def genparser(parser):
-	parser.add_argument("-t", "--text", metavar = "text", default = "ABCDEFGHIJKLMNOPQRSTUVWXYZ", help = "Text to draw. Defaults to '%(default)s'.")
-	parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output file which should be written. Mandatory argument.")
-	parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
-	parser.add_argument("font_filename", help = "Font filename to read")
-mc.register("draw", "Draw some text using a font into a PNG image", genparser, action = ActionDraw)
-
-def genparser(parser):
-	parser.add_argument("-g", "--glyphs", metavar = "glyphstr", help = "Specifies which glyphs to apply manipulator to. By default applies to all glyphs.")
-	parser.add_argument("-i", "--infile", metavar = "filename", required = True, help = "Specifies the input font file which should be read. Mandatory argument.")
-	parser.add_argument("-o", "--outfile", metavar = "filename", required = True, help = "Specifies the output font file which should be written. Mandatory argument.")
-	parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
-	parser.add_argument("manipulator", type = ActionManipulate.parse_manipulator, nargs = "+", help = "Manipulator to apply to glyph(s)")
-mc.register("manipulate", "Manipulate a font", genparser, action = ActionManipulate)
-
-def genparser(parser):
-	parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times to increase even more.")
-	parser.add_argument("font_filename", help = "Font filename to read")
-mc.register("debug", "Debug pixelfonttoolkit", genparser, action = ActionDebug)
-
-mc.run(sys.argv[1:])
+create_multicommand().run(sys.argv[1:])
@@ -0,0 +1,65 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import subprocess
+import pytest
+from pftk.Font import Font
+
+# Any TrueType font will do; set PFTK_TEST_TTF to use a specific one
+_TTF_CANDIDATES = [
+	os.environ.get("PFTK_TEST_TTF"),
+	"/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+	"/usr/share/fonts/dejavu/DejaVuSans.ttf",
+	"/usr/share/fonts/TTF/DejaVuSans.ttf",
+	"/Library/Fonts/Arial.ttf",
+	"C:\\Windows\\Fonts\\arial.ttf",
+]
+
+def _find_ttf():
+	for filename in _TTF_CANDIDATES:
+		if (filename is not None) and os.path.isfile(filename):
+			return filename
+	pytest.skip("no TrueType font found, set PFTK_TEST_TTF")
+
+def _pftk(*args):
+	subprocess.run([ sys.executable, "-m", "pftk" ] + list(args), check = True, cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.mark.parametrize("antialiasing", [ False, True ])
+def test_import_ttf_convert(tmp_path, antialiasing):
+	font_filename = str(tmp_path / "font.json")
+	_pftk("import-ttf", "-s", "16", "-j", "1", "-o", font_filename, *([ "-a" ] if antialiasing else [ ]), _find_ttf())
+	font = Font.load_from_file(font_filename)
+
+	# Blank glyphs such as the space are kept with their advance
+	space = font.get_glyph(" ")
+	assert (space.width, space.height) == (0, 0)
+	assert space.xadvance > 0
+
+	# All other glyphs are cropped to their ink
+	for (codepoint, glyph) in font:
+		if glyph.width > 0:
+			assert tuple(glyph.find_extents()) == (0, glyph.width - 1, 0, glyph.height - 1), codepoint
+
+	for output_format in [ "python", "ascii", "bitfontmaker" ]:
+		_pftk("convert", "-f", output_format, "-o", str(tmp_path / ("font." + output_format)), font_filename)
+	_pftk("manipulate", "-i", font_filename, "-o", font_filename, "optimize")
@@ -0,0 +1,31 @@
+#	pixelfonttoolkit - Pixel font generation and handling tools.
+#	Copyright (C) 2020-2021 Johannes Bauer
+#
+#	This file is part of pixelfonttoolkit.
+#
+#	pixelfonttoolkit is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pixelfonttoolkit is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pixelfonttoolkit; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import pytest
+from pftk.SelfCheck import SelfCheck
+
+# Fixed seeds so that a failure can be reproduced with
+# "python3 -m pftk selfcheck -n 20 -s <seed>"
+@pytest.mark.parametrize("seed", [ 1, 2, 3 ])
+def test_selfcheck(seed):
+	check = SelfCheck(seed = seed)
+	success = check.run(20)
+	assert success, "\n".join("%s, font %d: %s" % (mismatch.check, mismatch.font_index, mismatch.detail) for mismatch in check.mismatches)